@@ -1,9 +1,37 @@
+import argparse
 import os
+import sys
 
-from spotify_stack import run_app
+from spotify_stack import run_app, run_cli
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Spotify Stack Player")
+    parser.add_argument("--action", help="run comma-separated actions (e.g. hop_in_album,next_track) and exit")
+    parser.add_argument("--account", help="account name from SP_STACK_ACCOUNTS for --action")
+    parser.add_argument("--list-actions", action="store_true", help="list available actions and exit")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.list_actions:
+        from spotify_stack.actions import DEFAULT_ACTIONS
+
+        for action in DEFAULT_ACTIONS:
+            print(f"{action.name:<28} {action.label}")
+        sys.exit(0)
+    if args.action:
+        sys.exit(run_cli([name.strip() for name in args.action.split(",") if name.strip()], account=args.account))
+
     # Some macOS environments can abort when initializing global keyboard hooks.
     # Keep the app usable by default; opt-in to hotkeys with SP_STACK_HOTKEYS=1.
-    run_app(enable_hotkeys=os.getenv("SP_STACK_HOTKEYS") == "1")
+    # SP_STACK_PROFILE=1 counts callbacks, wakeups, workers and API calls and
+    # prints a report on exit; SP_STACK_HEADLESS=1 hides the windows and
+    # SP_STACK_PROFILE_SECONDS=N exits after N seconds.
+    run_app(
+        enable_hotkeys=os.getenv("SP_STACK_HOTKEYS") == "1",
+        profile=os.getenv("SP_STACK_PROFILE") == "1",
+        headless=os.getenv("SP_STACK_HEADLESS") == "1",
+        duration_s=float(os.getenv("SP_STACK_PROFILE_SECONDS") or 0) or None,
+    )
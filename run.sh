@@ -11,8 +11,14 @@ fi
 
 source .venv-tk/bin/activate
 
-if [[ "${1:-}" == "--hotkeys" ]]; then
-  SP_STACK_HOTKEYS=1 exec python main.py
-else
-  exec python main.py
-fi
+passthrough=()
+for arg in "$@"; do
+  case "$arg" in
+    --hotkeys) export SP_STACK_HOTKEYS=1 ;;
+    --profile) export SP_STACK_PROFILE=1 ;;
+    --headless) export SP_STACK_HEADLESS=1 ;;
+    *) passthrough+=("$arg") ;;
+  esac
+done
+
+exec python main.py ${passthrough[@]+"${passthrough[@]}"}
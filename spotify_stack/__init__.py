@@ -1,6 +1,6 @@
 """Spotify Stack Player package."""
 
-__all__ = ["run_app"]
+__all__ = ["run_app", "run_cli"]
 
 
 def run_app(*args, **kwargs):
@@ -8,3 +8,9 @@ def run_app(*args, **kwargs):
     from .app import run_app as _run_app
 
     return _run_app(*args, **kwargs)
+
+
+def run_cli(*args, **kwargs):
+    from .app import run_cli as _run_cli
+
+    return _run_cli(*args, **kwargs)
@@ -0,0 +1,185 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Union
+
+from .controller import ActionState, SpotifyStackController
+
+
+NEEDS = ("playback", "device_id", "queue_snapshot", "album_tracks")
+
+
+@dataclass(frozen=True)
+class Action:
+    name: str
+    label: str
+    # Called as run(controller, state, count); count > 1 only for coalesced hotkeys.
+    run: Callable[[SpotifyStackController, ActionState, int], str]
+    # The ActionState properties run may read; each is fetched on first read.
+    needs: FrozenSet[str] = frozenset()
+    changes_playback: bool = True
+    button: bool = True
+    # Actions sharing a group render as one split button cell.
+    group: Optional[str] = None
+    hotkey: Optional[str] = None
+    long_press_hotkey: Optional[str] = None
+    repeat: str = "ignore"
+
+
+# One place to declare an action. Buttons, hotkeys and the CLI are all generated
+# from the registry, and a batch of actions shares one ActionState, so each piece
+# of Spotify state is fetched at most once per batch, and only if an action
+# actually reads it.
+class ActionRegistry:
+    def __init__(self, actions: Iterable[Action] = ()):
+        self._actions: Dict[str, Action] = {}
+        for action in actions:
+            self.register(action)
+
+    def register(self, action: Action) -> Action:
+        if action.name in self._actions:
+            raise ValueError(f"Action already registered: {action.name}")
+        unknown = set(action.needs) - set(NEEDS)
+        if unknown:
+            raise ValueError(f"Unknown needs for {action.name}: {sorted(unknown)}")
+        self._actions[action.name] = action
+        return action
+
+    def action(self, name: str, label: str, **options):
+        def decorator(run):
+            self.register(Action(name=name, label=label, run=run, **options))
+            return run
+
+        return decorator
+
+    def get(self, name: str) -> Action:
+        try:
+            return self._actions[name]
+        except KeyError:
+            raise KeyError(f"Unknown action: {name}") from None
+
+    def names(self) -> List[str]:
+        return list(self._actions)
+
+    def __iter__(self) -> Iterator[Action]:
+        return iter(list(self._actions.values()))
+
+    def buttons(self) -> List[Action]:
+        return [action for action in self if action.button]
+
+    def keymap(self) -> Dict[str, Union[str, dict]]:
+        keymap: Dict[str, dict] = {}
+        for action in self:
+            if action.hotkey:
+                binding = keymap.setdefault(action.hotkey, {})
+                binding["press"] = action.name
+                if action.repeat != "ignore":
+                    binding["repeat"] = action.repeat
+            if action.long_press_hotkey:
+                keymap.setdefault(action.long_press_hotkey, {})["long_press"] = action.name
+        return {key: binding["press"] if list(binding) == ["press"] else binding for key, binding in keymap.items()}
+
+    def run(self, controller: SpotifyStackController, name: str, count: int = 1) -> str:
+        return self.run_batch(controller, [name], count=count)[0]
+
+    def run_batch(self, controller: SpotifyStackController, names: List[str], count: int = 1) -> List[str]:
+        actions = [self.get(name) for name in names]
+        state = ActionState(controller)
+        results = []
+        for action in actions:
+            results.append(action.run(controller, state, count))
+            if action.changes_playback:
+                state.playback_changed()
+        return results
+
+
+DEFAULT_ACTIONS = ActionRegistry(
+    [
+        Action(
+            name="previous_track",
+            label="⏮ Prev",
+            run=lambda c, s, n: c.previous_track(state=s),
+            needs=frozenset({"playback", "device_id"}),
+            hotkey="f13",
+        ),
+        Action(
+            name="toggle_playback",
+            label="⏯ Play/Pause",
+            run=lambda c, s, n: c.toggle_playback(state=s),
+            needs=frozenset({"playback", "device_id"}),
+            hotkey="f20",
+        ),
+        Action(
+            name="next_track",
+            label="Next ⏭",
+            run=lambda c, s, n: c.next_track(state=s),
+            needs=frozenset({"device_id"}),
+            hotkey="f15",
+        ),
+        Action(
+            name="queue_new_from_top_tracks",
+            label="⌁ Queue Top",
+            run=lambda c, s, n: c.queue_new_from_top_tracks(state=s),
+            needs=frozenset({"playback", "device_id", "queue_snapshot"}),
+            hotkey="f17",
+        ),
+        Action(
+            name="seek_back",
+            label="-10s",
+            run=lambda c, s, n: c.seek_relative(-10 * n, state=s),
+            needs=frozenset({"playback", "device_id"}),
+            group="seek",
+            hotkey="f16",
+            repeat="coalesce",
+        ),
+        Action(
+            name="seek_forward",
+            label="+10s",
+            run=lambda c, s, n: c.seek_relative(10 * n, state=s),
+            needs=frozenset({"playback", "device_id"}),
+            group="seek",
+            hotkey="f18",
+            repeat="coalesce",
+        ),
+        Action(
+            name="hop_in_album",
+            label="↳ Hop In Here",
+            run=lambda c, s, n: c.hop_in_album(state=s),
+            needs=frozenset({"playback", "device_id", "queue_snapshot"}),
+            hotkey="f14",
+        ),
+        Action(
+            name="hop_in_album_start",
+            label="↳ Hop In Start",
+            run=lambda c, s, n: c.hop_in_album(from_start=True, state=s),
+            needs=frozenset({"playback", "device_id", "queue_snapshot"}),
+        ),
+        Action(
+            name="hop_in_artist",
+            label="↳ Artist",
+            run=lambda c, s, n: c.hop_in_artist(state=s),
+            needs=frozenset({"playback", "device_id", "queue_snapshot"}),
+            group="artist",
+        ),
+        Action(
+            name="hop_in_artist_radio",
+            label="↳ Artist Radio",
+            run=lambda c, s, n: c.hop_in_artist(radio=True, state=s),
+            needs=frozenset({"playback", "device_id", "queue_snapshot"}),
+            group="artist",
+        ),
+        Action(
+            name="hop_out",
+            label="↲ Hop Out",
+            run=lambda c, s, n: c.hop_out(state=s),
+            needs=frozenset({"device_id"}),
+            hotkey="f19",
+        ),
+        Action(
+            name="hop_out_to_root",
+            label="⇤ Hop Out To Root",
+            run=lambda c, s, n: c.hop_out_to_root(state=s),
+            needs=frozenset({"device_id"}),
+            button=False,
+            long_press_hotkey="f19",
+        ),
+    ]
+)
@@ -1,12 +1,19 @@
 import os
+import sys
 import tkinter as tk
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from spotipy import Spotify
 from spotipy.oauth2 import SpotifyOAuth
 
+from .actions import DEFAULT_ACTIONS
 from .controller import SpotifyStackController
-from .hotkeys import HotkeyManager
+from .hotkeys import HotkeyManager, load_keymap
+from .metadata_store import MetadataStore
+from .pool import AccountConfig, ControllerPool
+from .profiling import RunProfiler
+from .snapshot import StackLibrary
 from .ui import SpotifyStackApp
 
 
@@ -22,8 +29,23 @@ TOKEN_CACHE_PATH = os.getenv(
     os.path.join(os.path.dirname(os.path.dirname(__file__)), ".spotify_token_cache"),
 )
 
+METADATA_DB_PATH = os.getenv(
+    "SP_STACK_METADATA_DB",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".spotify_metadata.sqlite"),
+)
+
+HISTORY_PATH = os.getenv(
+    "SP_STACK_HISTORY_DB",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".spotify_history.sqlite"),
+)
+
+STACKS_DIR = os.getenv(
+    "SP_STACK_STACKS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "stacks"),
+)
+
 
-def get_spotify_client() -> Spotify:
+def get_spotify_client(token_cache_path: str = TOKEN_CACHE_PATH, requests_session=None) -> Spotify:
     # Force .env values to override any stale exported shell variables.
     load_dotenv(override=True)
     redirect_uri = os.getenv("SPOTIFY_REDIRECT_URI") or ""
@@ -39,32 +61,138 @@ def get_spotify_client() -> Spotify:
             client_secret=os.getenv("SPOTIFY_CLIENT_SECRET"),
             redirect_uri=redirect_uri,
             scope=SCOPE,
-            cache_path=TOKEN_CACHE_PATH,
+            cache_path=token_cache_path,
+            requests_session=requests_session or True,
+        ),
+        requests_session=requests_session or True,
+    )
+
+
+def accounts_from_env() -> List[AccountConfig]:
+    # SP_STACK_ACCOUNTS=home,demo drives several accounts from one process. Each
+    # extra account gets its own token cache and an optional device name from
+    # SP_STACK_DEVICE_<NAME>.
+    load_dotenv(override=True)
+    names = [name.strip() for name in (os.getenv("SP_STACK_ACCOUNTS") or "").split(",") if name.strip()]
+    if not names:
+        return [
+            AccountConfig(
+                name="default",
+                token_cache_path=TOKEN_CACHE_PATH,
+                device_name=os.getenv("SP_STACK_DEVICE"),
+                history_path=HISTORY_PATH,
+                stacks_dir=STACKS_DIR,
+            )
+        ]
+
+    return [
+        AccountConfig(
+            name=name,
+            token_cache_path=TOKEN_CACHE_PATH if idx == 0 else f"{TOKEN_CACHE_PATH}.{name}",
+            device_name=os.getenv(f"SP_STACK_DEVICE_{name.upper()}"),
+            history_path=HISTORY_PATH if idx == 0 else f"{HISTORY_PATH}.{name}",
+            stacks_dir=STACKS_DIR,
         )
+        for idx, name in enumerate(names)
+    ]
+
+
+def run_cli(action_names: List[str], account: Optional[str] = None) -> int:
+    # One-shot actions from the shell. The stack is kept in the stack library
+    # between invocations so hop in / hop out pair up across commands; each
+    # account keeps its own, since accounts may share one stacks directory.
+    unknown = [name for name in action_names if name not in DEFAULT_ACTIONS.names()]
+    if unknown:
+        print(f"Unknown action: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    configs = accounts_from_env()
+    config = next((c for c in configs if c.name == account), None) if account else configs[0]
+    if config is None:
+        print(f"Unknown account: {account}", file=sys.stderr)
+        return 2
+
+    library = StackLibrary(config.stacks_dir or STACKS_DIR)
+    controller = SpotifyStackController(
+        get_spotify_client(config.token_cache_path),
+        metadata_cache=MetadataStore(METADATA_DB_PATH).namespace("context_labels"),
+        device_name=config.device_name,
+        stack_library=library,
     )
+    stack_name = f"cli-{config.name}"
+    loaded = controller.load_named_stack(stack_name)
+    if loaded.startswith("Could not load"):
+        # Start from an empty stack; saving below replaces the unreadable file.
+        print(loaded, file=sys.stderr)
+    try:
+        for result in DEFAULT_ACTIONS.run_batch(controller, action_names):
+            print(result)
+    finally:
+        controller.save_named_stack(stack_name)
+    return 0
+
 
+def run_app(
+    enable_hotkeys: bool = True,
+    profile: bool = False,
+    headless: bool = False,
+    duration_s: Optional[float] = None,
+):
+    profiler = RunProfiler() if profile else None
 
-def run_app(enable_hotkeys: bool = True):
-    sp = get_spotify_client()
-    controller = SpotifyStackController(sp)
+    def client_factory(config, session):
+        sp = get_spotify_client(config.token_cache_path, requests_session=session)
+        return profiler.instrument_client(sp) if profiler else sp
+
+    pool = ControllerPool(
+        client_factory=client_factory,
+        metadata_store=MetadataStore(METADATA_DB_PATH),
+    )
+    for config in accounts_from_env():
+        pool.add_account(config)
 
     root = tk.Tk()
-    hotkey_manager = HotkeyManager(handlers={})
+    hotkey_manager = HotkeyManager(handlers={}, keymap=load_keymap(os.getenv("SP_STACK_KEYMAP")))
 
     def register_hotkeys(handlers):
         hotkey_manager.handlers = handlers
         return hotkey_manager.start()
 
-    _app = SpotifyStackApp(
-        root,
-        controller,
-        enable_hotkeys=enable_hotkeys,
-        register_hotkeys=register_hotkeys,
-    )
+    _apps = []
+    for idx, session in enumerate(pool):
+        window = root if idx == 0 else tk.Toplevel(root)
+        if headless:
+            window.withdraw()
+        # Global hotkeys can only drive one account; they follow the first window.
+        _apps.append(
+            SpotifyStackApp(
+                window,
+                session.controller,
+                enable_hotkeys=enable_hotkeys and idx == 0,
+                register_hotkeys=register_hotkeys,
+                executor=pool.executor,
+                account_name=session.config.name if len(pool) > 1 else None,
+                profiler=profiler,
+            )
+        )
+
+    closed = False
 
     def on_close():
+        nonlocal closed
+        if closed:
+            return
+        closed = True
         hotkey_manager.stop()
+        pool.shutdown()
         root.destroy()
+        if profiler:
+            print(profiler.report(), file=sys.stderr)
 
     root.protocol("WM_DELETE_WINDOW", on_close)
-    root.mainloop()
+    if duration_s:
+        root.after(int(duration_s * 1000), on_close)
+    try:
+        root.mainloop()
+    except KeyboardInterrupt:
+        on_close()
@@ -0,0 +1,36 @@
+from concurrent.futures import Future
+from typing import Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+# Work handed to an executor that a caller may need before it has run. The
+# caller takes it over while it is still queued, since the executor may be full
+# of jobs waiting on that very caller; once a worker has started it, waiting for
+# the result cannot starve the executor.
+class BackgroundCall(Generic[T]):
+    def __init__(self, fn: Callable[[], T], on_done: Callable[["BackgroundCall[T]"], None]):
+        self.future: Future = Future()
+        self._fn = fn
+        self._on_done = on_done
+
+    def run(self):
+        # Submitted to the executor.
+        if not self.future.set_running_or_notify_cancel():
+            # result() took it over and ran it inline.
+            return
+        try:
+            result = self._fn()
+        except Exception as exc:
+            self.future.set_exception(exc)
+        else:
+            self.future.set_result(result)
+        finally:
+            self._on_done(self)
+
+    def result(self) -> T:
+        if not self.future.cancel():
+            return self.future.result()
+        self._on_done(self)
+        return self._fn()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .background import BackgroundCall
+
+@dataclass
+class ArtistCatalogEntry:
+    artist_uri: str
+    top_tracks: List[str]
+    discography: List[str]
+    fetched_at: float
+
+
+# Top tracks and discography per artist, kept in memory with LRU eviction. The
+# refresh loop prefetches the artist that is playing on the executor, so Hop In
+# Artist normally finds its tracks here instead of fetching at press time. Stale
+# entries are still served while a background refresh replaces them.
+class ArtistCatalog:
+    def __init__(
+        self,
+        sp: Any,
+        album_track_uris: Callable[[str], List[str]],
+        executor: Optional[Executor] = None,
+        max_artists: int = 64,
+        ttl_s: float = 6 * 60 * 60,
+        max_albums: int = 10,
+        max_tracks: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sp = sp
+        self.album_track_uris = album_track_uris
+        self.executor = executor
+        self.max_artists = max_artists
+        self.ttl_s = ttl_s
+        self.max_albums = max_albums
+        self.max_tracks = max_tracks
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, ArtistCatalogEntry]" = OrderedDict()
+        self._inflight: Dict[str, BackgroundCall[ArtistCatalogEntry]] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, artist_uri: str) -> bool:
+        with self._lock:
+            return artist_uri in self._entries
+
+    def peek(self, artist_uri: str) -> Optional[ArtistCatalogEntry]:
+        with self._lock:
+            return self._entries.get(artist_uri)
+
+    def get(self, artist_uri: str) -> ArtistCatalogEntry:
+        with self._lock:
+            entry = self._entries.get(artist_uri)
+            if entry is not None:
+                self._entries.move_to_end(artist_uri)
+            inflight = self._inflight.get(artist_uri)
+
+        if entry is not None:
+            if self._clock() - entry.fetched_at > self.ttl_s:
+                self.prefetch(artist_uri)
+            return entry
+        if inflight is not None:
+            return inflight.result()
+        return self._refresh(artist_uri)
+
+    def prefetch(self, artist_uri: str) -> Optional[Future]:
+        if self.executor is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(artist_uri)
+            if entry is not None and self._clock() - entry.fetched_at <= self.ttl_s:
+                return None
+            if artist_uri in self._inflight:
+                return self._inflight[artist_uri].future
+            call = BackgroundCall(
+                lambda: self._refresh(artist_uri), lambda done: self._forget_inflight(artist_uri, done)
+            )
+            self._inflight[artist_uri] = call
+        self.executor.submit(call.run)
+        return call.future
+
+    def invalidate(self, artist_uri: Optional[str] = None):
+        with self._lock:
+            if artist_uri is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(artist_uri, None)
+
+    def _forget_inflight(self, artist_uri: str, call: BackgroundCall):
+        with self._lock:
+            if self._inflight.get(artist_uri) is call:
+                del self._inflight[artist_uri]
+
+    def _refresh(self, artist_uri: str) -> ArtistCatalogEntry:
+        # Network calls run without the lock; only the insert takes it.
+        artist_id = artist_uri.split(":")[-1]
+        entry = ArtistCatalogEntry(
+            artist_uri=artist_uri,
+            top_tracks=self._fetch_top_tracks(artist_id),
+            discography=self._fetch_discography(artist_id),
+            fetched_at=self._clock(),
+        )
+        with self._lock:
+            self._entries[artist_uri] = entry
+            self._entries.move_to_end(artist_uri)
+            while len(self._entries) > self.max_artists:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _fetch_top_tracks(self, artist_id: str) -> List[str]:
+        response = self.sp.artist_top_tracks(artist_id) or {}
+        return [track["uri"] for track in response.get("tracks", []) if track.get("uri")]
+
+    def _fetch_discography(self, artist_id: str) -> List[str]:
+        response = self.sp.artist_albums(artist_id, album_type="album,single", limit=50) or {}
+        albums = sorted(response.get("items", []), key=lambda album: album.get("release_date") or "", reverse=True)
+
+        # Spotify lists regional and deluxe editions separately; keep one per title.
+        album_uris: List[str] = []
+        titles = set()
+        for album in albums:
+            title = (album.get("name") or "").lower()
+            if not album.get("uri") or title in titles:
+                continue
+            titles.add(title)
+            album_uris.append(album["uri"])
+            if len(album_uris) == self.max_albums:
+                break
+
+        tracks: List[str] = []
+        seen = set()
+        for album_uri in album_uris:
+            for uri in self.album_track_uris(album_uri):
+                if uri not in seen:
+                    seen.add(uri)
+                    tracks.append(uri)
+            if len(tracks) >= self.max_tracks:
+                break
+        return tracks[: self.max_tracks]
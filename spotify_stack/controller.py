@@ -1,12 +1,32 @@
 import random
-from dataclasses import dataclass
-from typing import List, Optional
+import threading
+import time
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, List, MutableMapping, Optional
 
 try:
     from spotipy import Spotify
 except ImportError:  # pragma: no cover
     Spotify = object  # type: ignore
 
+from .catalog import ArtistCatalog
+from .journal import CommandJournal, is_offline_error
+from .queue_engine import QueueEngine
+from .restore import (
+    DRIFT_TOLERANCE_MS,
+    RESTORE_CHECK_WINDOW_S,
+    LatencyEstimator,
+    PendingRestore,
+    extrapolate_progress,
+    measure_drift,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .history import HistoryEntry, SessionHistory
+    from .snapshot import StackLibrary
+
 
 @dataclass
 class PlaybackFrame:
@@ -19,12 +39,152 @@ class PlaybackFrame:
     source_label: str
 
 
+# Spotify state one or more actions read, fetched at most once and shared. A
+# batch of actions shares one instance; see actions.py.
+class ActionState:
+    def __init__(self, controller: "SpotifyStackController"):
+        self._controller = controller
+        self._values: dict = {}
+        self.fetched_at: Optional[float] = None
+
+    def _get(self, key: str, fetch):
+        if key not in self._values:
+            self._values[key] = fetch()
+        return self._values[key]
+
+    @property
+    def playback(self) -> Optional[dict]:
+        def fetch():
+            playback, self.fetched_at = self._controller._playback_or_last_known()
+            return playback
+
+        return self._get("playback", fetch)
+
+    @property
+    def device_id(self) -> Optional[str]:
+        return self._get("device", lambda: self._controller._resolve_device_id(self))
+
+    def forget_device(self):
+        self._values.pop("device", None)
+
+    @property
+    def queue_snapshot(self) -> Optional[List[str]]:
+        return self._get("queue", self._controller._snapshot_resume_uris)
+
+    @property
+    def album_tracks(self) -> List[str]:
+        def fetch():
+            album_uri = (((self.playback or {}).get("item") or {}).get("album") or {}).get("uri")
+            return self._controller.album_track_uris(album_uri) if album_uri else []
+
+        return self._get("album_tracks", fetch)
+
+    def playback_changed(self):
+        # The device survives a track change; what is playing does not.
+        for key in ("playback", "queue", "album_tracks"):
+            self._values.pop(key, None)
+
+
+# UI workers call into one controller from several threads. Shared state only
+# changes under self._lock, which is never held across a Spotify call. Hops push
+# (or claim) their frame before playing and, if playback fails, put back exactly
+# that frame, so whatever other workers pushed or popped meanwhile survives. A
+# hop out waits until the frame it would leave has settled.
 class SpotifyStackController:
-    def __init__(self, sp: Spotify):
+    def __init__(
+        self,
+        sp: Spotify,
+        metadata_cache: Optional[MutableMapping[str, str]] = None,
+        device_name: Optional[str] = None,
+        album_tracks_cache: Optional[MutableMapping[str, List[str]]] = None,
+        history: Optional["SessionHistory"] = None,
+        stack_library: Optional["StackLibrary"] = None,
+        executor: Optional[Executor] = None,
+    ):
         self.sp = sp
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._settled = threading.Condition(self._lock)
+        self._unsettled: set = set()
         self.stack: List[PlaybackFrame] = []
         self.active_uris: List[str] = []
-        self._context_name_cache: dict[str, str] = {}
+        self.active_label = "Top Queue"
+        # May be shared with other controllers, in this process (see pool.py) or
+        # across processes (see metadata_store.py).
+        self._context_name_cache: MutableMapping[str, str] = metadata_cache if metadata_cache is not None else {}
+        self._album_tracks_cache: MutableMapping[str, List[str]] = (
+            album_tracks_cache if album_tracks_cache is not None else {}
+        )
+        self.device_name = device_name
+        self._device_registry: dict[str, str] = {}
+        self.history = history
+        self.stack_library = stack_library
+        self.journal = CommandJournal()
+        self._last_playback: Optional[dict] = None
+        self._last_playback_at: Optional[float] = None
+        self.latency = LatencyEstimator()
+        self._pending_restore: Optional[PendingRestore] = None
+        self._replaying = False
+        self._playlist_tracks_cache: dict[str, List[str]] = {}
+        self.queue_engine = QueueEngine(
+            sources={
+                "short_term": lambda: self.get_all_top_tracks(max_tracks=200, time_range="short_term"),
+                "medium_term": lambda: self.get_all_top_tracks(max_tracks=200, time_range="medium_term"),
+                "long_term": lambda: self.get_all_top_tracks(max_tracks=200, time_range="long_term"),
+                "playlists": self._cached_playlist_tracks,
+            },
+            executor=executor,
+        )
+        self.catalog = ArtistCatalog(sp, self.album_track_uris, executor=executor)
+
+    @property
+    def _last_landed_at(self) -> Optional[float]:
+        # Per thread: each worker marks the frame it left by its own landing.
+        return getattr(self._local, "landed_at", None)
+
+    @_last_landed_at.setter
+    def _last_landed_at(self, value: Optional[float]):
+        self._local.landed_at = value
+
+    def _stack_snapshot(self) -> List[PlaybackFrame]:
+        with self._lock:
+            return list(self.stack)
+
+    def _remove_frame(self, frame: PlaybackFrame) -> bool:
+        with self._lock:
+            for idx in range(len(self.stack) - 1, -1, -1):
+                if self.stack[idx] is frame:
+                    del self.stack[idx]
+                    return True
+            return False
+
+    def _return_frames(self, frames: List[PlaybackFrame], index: int):
+        # Back where they were claimed from, below anything pushed since.
+        with self._lock:
+            self.stack[index:index] = frames
+
+    @contextmanager
+    def _pushed(self, frame: Optional[PlaybackFrame]):
+        if frame is None:
+            yield
+            return
+        with self._lock:
+            self.stack.append(frame)
+            self._unsettled.add(id(frame))
+        try:
+            yield
+        except BaseException:
+            self._remove_frame(frame)
+            raise
+        finally:
+            with self._lock:
+                self._unsettled.discard(id(frame))
+                self._settled.notify_all()
+
+    def _set_active(self, uris: List[str], label: str):
+        with self._lock:
+            self.active_uris = uris
+            self.active_label = label
 
     def _is_top_queue_playback(self, playback: dict) -> bool:
         if not self.active_uris:
@@ -35,10 +195,135 @@ class SpotifyStackController:
         return track_uri in self.active_uris
 
     def current_playback(self):
-        return self.sp.current_playback()
+        return self._fetch_playback()[0]
+
+    def _fetch_playback(self):
+        started = time.monotonic()
+        playback = self.sp.current_playback()
+        finished = time.monotonic()
+        # Spotify sampled the position somewhere mid-flight.
+        sampled_at = (started + finished) / 2
+        with self._lock:
+            self.latency.observe((finished - started) * 1000)
+            self._last_playback = playback
+            self._last_playback_at = sampled_at
+            replay = bool(self.journal) and not self._replaying
+        if playback:
+            self._check_restore_drift(playback, sampled_at)
+        if replay:
+            # Spotify is reachable again; flush what happened while it wasn't.
+            self.replay_journal()
+        return playback, sampled_at
+
+    def _playback_or_last_known(self):
+        try:
+            return self._fetch_playback()
+        except Exception as exc:
+            with self._lock:
+                last = (self._last_playback, self._last_playback_at)
+            if not is_offline_error(exc) or last[0] is None:
+                raise
+            return last
+
+    def _start_playback_or_journal(
+        self,
+        action: str,
+        kind: str,
+        state: Optional[ActionState] = None,
+        expected_item: Optional[dict] = None,
+        **kwargs,
+    ) -> bool:
+        self._last_landed_at = None
+        with self._lock:
+            queued = bool(self.journal)
+            if queued:
+                # Keep ordering: never jump ahead of intents still waiting for replay.
+                self.journal.record(action, kind, kwargs)
+        if not queued:
+            try:
+                self._start_playback(state=state, **kwargs)
+                return True
+            except Exception as exc:
+                if not is_offline_error(exc):
+                    raise
+                with self._lock:
+                    self.journal.record(action, kind, kwargs)
+        # Set before replaying: a replay that cancels out sends nothing to
+        # Spotify, yet playback still ends up at this target.
+        self._expect_playback(kwargs, expected_item)
+        return self.replay_journal() if queued else False
+
+    def _expect_playback(self, playback_kwargs: dict, item: Optional[dict]):
+        # While offline, later actions build their frames from where the journal
+        # will leave playback, not from what was playing before it.
+        track_uri = (playback_kwargs.get("offset") or {}).get("uri") or next(
+            iter(playback_kwargs.get("uris") or []), None
+        )
+        if item is None or (track_uri and item.get("uri") != track_uri):
+            item = {"uri": track_uri}
+        context_uri = playback_kwargs.get("context_uri")
+        with self._lock:
+            last = self._last_playback or {}
+            last_item = last.get("item") or {}
+            if track_uri and last_item.get("uri") == track_uri:
+                # Same track, so the album and artist details still apply.
+                item = {**last_item, **item}
+            self._last_playback = {
+                "is_playing": last.get("is_playing", True),
+                "progress_ms": playback_kwargs.get("position_ms") or 0,
+                "context": {"uri": context_uri} if context_uri else None,
+                "device": last.get("device"),
+                "item": item,
+            }
+            self._last_playback_at = time.monotonic()
+
+    def replay_journal(self) -> bool:
+        with self._lock:
+            if not self.journal:
+                return True
+            if self._replaying:
+                return False
+            self._replaying = True
+            entry = self.journal.net_effect()
+            claimed = len(self.journal)
+
+        try:
+            if entry:
+                self._start_playback(**entry.playback)
+            with self._lock:
+                self.journal.drop(claimed)
+            return True
+        except Exception as exc:
+            if not is_offline_error(exc):
+                # Replaying stale intents is best effort; drop what Spotify rejects.
+                with self._lock:
+                    self.journal.drop(claimed)
+                raise
+            return False
+        finally:
+            with self._lock:
+                self._replaying = False
 
-    def _active_device_id(self) -> Optional[str]:
-        playback = self.current_playback()
+    def _send_to_device(self, state: ActionState, command, **kwargs):
+        device_id = state.device_id
+        try:
+            return command(device_id=device_id, **kwargs)
+        except Exception as exc:
+            pinned = self.device_name and self._device_registry.get(self.device_name) == device_id
+            if not pinned or getattr(exc, "http_status", None) != 404:
+                raise
+        # The pinned device reconnected under a new id; look it up again once.
+        self.forget_devices()
+        state.forget_device()
+        return command(device_id=state.device_id, **kwargs)
+
+    def _resolve_device_id(self, state: ActionState) -> Optional[str]:
+        if self.device_name:
+            device_id = self._named_device_id(self.device_name)
+            if device_id:
+                return device_id
+
+        playback = state.playback
         if playback and playback.get("device"):
             return playback["device"].get("id")
 
@@ -48,20 +333,98 @@ class SpotifyStackController:
             return active.get("id")
         return None
 
+    def _named_device_id(self, name: str) -> Optional[str]:
+        if name in self._device_registry:
+            return self._device_registry[name]
+
+        devices = self.sp.devices().get("devices", [])
+        self._device_registry = {d["name"]: d["id"] for d in devices if d.get("name") and d.get("id")}
+        return self._device_registry.get(name)
+
+    def forget_devices(self):
+        self._device_registry = {}
+
     def _start_playback(
         self,
         context_uri: Optional[str] = None,
         uris: Optional[List[str]] = None,
         offset: Optional[dict] = None,
         position_ms: Optional[int] = None,
+        extrapolate_from: Optional[float] = None,
+        state: Optional[ActionState] = None,
     ):
-        self.sp.start_playback(
-            device_id=self._active_device_id(),
+        state = state or ActionState(self)
+        # Resolved first: the position below accounts for the lookup time.
+        state.device_id
+        if position_ms is not None and extrapolate_from is not None:
+            # The track kept playing during the device lookup and keeps playing
+            # while the command is in flight.
+            elapsed_ms = (time.monotonic() - extrapolate_from) * 1000 + self.latency.one_way_ms()
+            position_ms = extrapolate_progress(position_ms, elapsed_ms)
+
+        started = time.monotonic()
+        self._send_to_device(
+            state,
+            self.sp.start_playback,
             context_uri=context_uri,
             uris=uris,
             offset=offset,
             position_ms=position_ms,
         )
+        finished = time.monotonic()
+        with self._lock:
+            self.latency.observe((finished - started) * 1000)
+            landed_at = finished - self.latency.one_way_ms() / 1000
+            track_uri = (offset or {}).get("uri")
+            if track_uri and position_ms is not None:
+                self._pending_restore = PendingRestore(
+                    track_uri=track_uri,
+                    target_ms=position_ms,
+                    landed_at=landed_at,
+                    expires_at=finished + RESTORE_CHECK_WINDOW_S,
+                )
+            else:
+                self._pending_restore = None
+        self._last_landed_at = landed_at
+
+    def _check_restore_drift(self, playback: dict, sampled_at: float):
+        with self._lock:
+            pending = self._pending_restore
+            if pending is None:
+                return
+            if time.monotonic() > pending.expires_at:
+                self._pending_restore = None
+                return
+
+            drift = measure_drift(pending, playback, sampled_at)
+            if drift is None:
+                # Spotify has not switched over yet; look again on the next refresh.
+                return
+            self._pending_restore = None
+        if abs(drift) <= DRIFT_TOLERANCE_MS:
+            return
+
+        # progress_ms - drift is where playback should have been at sampled_at.
+        target = playback.get("progress_ms", 0) - drift
+        if playback.get("is_playing"):
+            target += int((time.monotonic() - sampled_at) * 1000) + self.latency.one_way_ms()
+        device_id = (playback.get("device") or {}).get("id")
+        try:
+            self.sp.seek_track(position_ms=max(0, target), device_id=device_id)
+        except Exception:
+            # Best effort; the playback fetch that triggered it still succeeded.
+            pass
+
+    def _mark_frame_left(self, frame: PlaybackFrame, playback: dict, fetched_at: Optional[float]):
+        # The frame's progress was read before the switch; move it to where the
+        # old context actually was when the new one took over. No-op unless the
+        # last start_playback actually reached Spotify.
+        if not playback.get("is_playing") or fetched_at is None or self._last_landed_at is None:
+            return
+        duration_ms = (playback.get("item") or {}).get("duration_ms")
+        frame.progress_ms = extrapolate_progress(
+            frame.progress_ms, (self._last_landed_at - fetched_at) * 1000, duration_ms
+        )
 
     def _snapshot_resume_uris(self) -> Optional[List[str]]:
         uris: List[str] = []
@@ -99,7 +462,7 @@ class SpotifyStackController:
         is_top_queue: bool = False,
     ) -> str:
         if is_top_queue:
-            return "Top Queue"
+            return self.active_label
 
         if not context_uri:
             # When Spotify omits context, derive a useful label from track metadata.
@@ -107,8 +470,10 @@ class SpotifyStackController:
                 return f"Album: {(item.get('album') or {}).get('name')}"
             return "Ad-hoc queue"
 
-        if context_uri in self._context_name_cache:
-            return self._context_name_cache[context_uri]
+        # One lookup: a shared cache can drop the key between a check and a read.
+        cached = self._context_name_cache.get(context_uri)
+        if cached is not None:
+            return cached
 
         if not context_uri.startswith("spotify:"):
             return context_uri
@@ -134,6 +499,7 @@ class SpotifyStackController:
                 return label
 
         label: Optional[str] = None
+        lookup_failed = False
         try:
             if kind == "playlist":
                 label = (self.sp.playlist(context_id) or {}).get("name")
@@ -143,6 +509,7 @@ class SpotifyStackController:
                 label = (self.sp.artist(context_id) or {}).get("name")
         except Exception:
             label = None
+            lookup_failed = True
 
         if not label:
             friendly_kind = {
@@ -154,10 +521,15 @@ class SpotifyStackController:
             }.get(kind, "Context")
             label = friendly_kind
 
-        self._context_name_cache[context_uri] = label
+        # The cache may be host-wide and long-lived; a failed lookup is retried
+        # next time instead of pinning the generic label there.
+        if not lookup_failed:
+            self._context_name_cache[context_uri] = label
         return label
 
-    def _build_frame_from_playback(self, playback: dict) -> PlaybackFrame:
+    def _build_frame_from_playback(
+        self, playback: dict, snapshot_queue: bool = True, state: Optional[ActionState] = None
+    ) -> PlaybackFrame:
         item = playback.get("item") or {}
         artists = item.get("artists") or []
         context_uri = (playback.get("context") or {}).get("uri")
@@ -167,7 +539,7 @@ class SpotifyStackController:
             context_uri=context_uri,
             track_uri=item.get("uri"),
             progress_ms=playback.get("progress_ms", 0),
-            resume_uris=self._snapshot_resume_uris(),
+            resume_uris=(state.queue_snapshot if state else self._snapshot_resume_uris()) if snapshot_queue else None,
             track_name=item.get("name") or "Unknown track",
             artist_names=", ".join(artist.get("name", "") for artist in artists) or "Unknown artist",
             source_label=self._source_label_from_context(
@@ -175,6 +547,63 @@ class SpotifyStackController:
             ),
         )
 
+    def _record_history(self, event: str, frame: PlaybackFrame):
+        if self.history is None:
+            return
+        try:
+            self.history.record(event, frame)
+        except Exception:
+            # History is a convenience; never let it break playback control.
+            pass
+
+    def observe_playback(self, playback: Optional[dict]):
+        # Build the Queue Top pool off the button press.
+        self.queue_engine.warm()
+        if not playback or not playback.get("item"):
+            return
+        artist_uri = ((playback["item"].get("artists") or [{}])[0]).get("uri")
+        if artist_uri:
+            # Warm the catalog so Hop In Artist does not fetch at press time.
+            self.catalog.prefetch(artist_uri)
+        if self.history is None:
+            return
+        self._record_history("observed", self._build_frame_from_playback(playback, snapshot_queue=False))
+
+    def search_history(self, query: str, limit: int = 20) -> List["HistoryEntry"]:
+        if self.history is None:
+            return []
+        return self.history.search(query, limit=limit)
+
+    def restore_history_entry(self, entry_id: int, state: Optional[ActionState] = None):
+        entry = self.history.get(entry_id) if self.history is not None else None
+        if entry is None:
+            return "History entry not found."
+        target = entry.frame
+        if not target.context_uri and not target.resume_uris and target.track_uri:
+            # Observed frames carry no queue snapshot; without a context the
+            # track itself is all there is to go back to.
+            target = replace(target, resume_uris=[target.track_uri])
+
+        state = state or ActionState(self)
+        playback = state.playback
+        fetched_at = state.fetched_at
+        current = None
+        if playback and playback.get("item"):
+            current = self._build_frame_from_playback(playback, state=state)
+
+        with self._pushed(current):
+            restored = self._restore_frame(
+                target, "restore_history_entry", "push" if current else "play", state=state
+            )
+        if not restored:
+            if current:
+                self._remove_frame(current)
+            return "Hop back failed: no resumable frame"
+        if current:
+            self._mark_frame_left(current, playback, fetched_at)
+            self._record_history("pushed", current)
+        return f"Hop back: {entry.frame.track_name} - {entry.frame.artist_names} ({restored})"
+
     def describe_playback_source(self, playback: Optional[dict] = None) -> str:
         if not playback:
             playback = self.current_playback()
@@ -191,67 +620,85 @@ class SpotifyStackController:
             is_top_queue=is_top_queue,
         )
 
-    def toggle_playback(self):
-        playback = self.current_playback()
+    def toggle_playback(self, state: Optional[ActionState] = None):
+        state = state or ActionState(self)
+        playback = state.playback
         if not playback:
             return "No active playback."
         if playback.get("is_playing"):
-            self.sp.pause_playback(device_id=self._active_device_id())
+            self._send_to_device(state, self.sp.pause_playback)
             return "Paused"
-        self.sp.start_playback(device_id=self._active_device_id())
+        self._send_to_device(state, self.sp.start_playback)
         return "Playing"
 
-    def next_track(self):
-        self.sp.next_track(device_id=self._active_device_id())
+    def next_track(self, state: Optional[ActionState] = None):
+        self._send_to_device(state or ActionState(self), self.sp.next_track)
         return "Skipped"
 
-    def previous_track(self):
-        playback = self.current_playback()
+    def previous_track(self, state: Optional[ActionState] = None):
+        state = state or ActionState(self)
+        playback = state.playback
         if not playback:
             return "No active playback."
 
         if playback.get("progress_ms", 0) < 10_000:
-            self.sp.previous_track(device_id=self._active_device_id())
+            self._send_to_device(state, self.sp.previous_track)
         else:
-            self.sp.seek_track(position_ms=0, device_id=self._active_device_id())
+            self._send_to_device(state, self.sp.seek_track, position_ms=0)
         return "Previous"
 
-    def seek_relative(self, delta_seconds: int):
-        playback = self.current_playback()
+    def seek_relative(self, delta_seconds: int, state: Optional[ActionState] = None):
+        state = state or ActionState(self)
+        playback = state.playback
         if not playback or not playback.get("item"):
             return "No active playback."
 
         progress = playback.get("progress_ms", 0)
         duration = playback["item"].get("duration_ms", 0)
         target = max(0, min(duration, progress + (delta_seconds * 1000)))
-        self.sp.seek_track(position_ms=target, device_id=self._active_device_id())
+        self._send_to_device(state, self.sp.seek_track, position_ms=target)
         return f"Seeked to {target // 1000}s"
 
-    def queue_new_from_top_tracks(self, size: int = 30):
-        playback = self.current_playback()
+    def queue_new_from_top_tracks(self, size: int = 30, state: Optional[ActionState] = None):
+        state = state or ActionState(self)
+        playback = state.playback
+        fetched_at = state.fetched_at
+        frame = None
         if playback and playback.get("item"):
             # Entering a new ad-hoc queue should be stack-aware.
-            self.stack.append(self._build_frame_from_playback(playback))
-
-        tracks = self.get_all_top_tracks(max_tracks=200)
-        if len(tracks) < size:
-            size = len(tracks)
-        if size == 0:
-            if playback and playback.get("item") and self.stack:
-                self.stack.pop()
-            return "No top tracks available."
-
-        selection = random.sample(tracks, size)
-        self.active_uris = selection
-        self._start_playback(uris=selection)
-        return f"Entered queue: shuffled top {size}"
-
-    def get_all_top_tracks(self, max_tracks: int = 200, batch_size: int = 50) -> List[str]:
+            frame = self._build_frame_from_playback(playback, state=state)
+
+        with self._pushed(frame):
+            # Keep the new queue clear of anything the stack will resume into.
+            exclude = set(self.active_uris)
+            for stacked in self._stack_snapshot():
+                exclude.update(stacked.resume_uris or [])
+                if stacked.track_uri:
+                    exclude.add(stacked.track_uri)
+
+            selection = self.queue_engine.sample(size, exclude=exclude)
+            if not selection:
+                if frame:
+                    self._remove_frame(frame)
+                return "No top tracks available."
+
+            played = self._start_playback_or_journal(
+                "queue_new_from_top_tracks", "push" if frame else "play", state=state, uris=selection
+            )
+        self._set_active(selection, "Top Queue")
+        if frame:
+            self._mark_frame_left(frame, playback, fetched_at)
+            self._record_history("pushed", frame)
+        return f"Entered queue: shuffled top {len(selection)}" + _offline_note(played)
+
+    def get_all_top_tracks(
+        self, max_tracks: int = 200, batch_size: int = 50, time_range: str = "medium_term"
+    ) -> List[str]:
         tracks: List[str] = []
         offset = 0
 
         while len(tracks) < max_tracks:
-            response = self.sp.current_user_top_tracks(limit=batch_size, offset=offset)
+            response = self.sp.current_user_top_tracks(limit=batch_size, offset=offset, time_range=time_range)
             items = response.get("items", [])
             if not items:
                 break
@@ -260,67 +707,256 @@ class SpotifyStackController:
 
         return tracks[:max_tracks]
 
-    def hop_in_album(self, from_start: bool = False):
-        playback = self.current_playback()
+    def album_track_uris(self, album_uri: str) -> List[str]:
+        cached = self._album_tracks_cache.get(album_uri)
+        if cached is not None:
+            return cached
+
+        album_id = album_uri.split(":")[-1]
+        tracks: List[str] = []
+        offset = 0
+        while True:
+            response = self.sp.album_tracks(album_id, limit=50, offset=offset)
+            items = response.get("items", [])
+            tracks.extend(item["uri"] for item in items if item.get("uri"))
+            if not items or not response.get("next"):
+                break
+            offset += len(items)
+
+        self._album_tracks_cache[album_uri] = tracks
+        return tracks
+
+    def _cached_playlist_tracks(self) -> List[str]:
+        tracks: List[str] = []
+        for frame in self._stack_snapshot():
+            uri = frame.context_uri or ""
+            if not uri.startswith("spotify:playlist:"):
+                continue
+            if uri not in self._playlist_tracks_cache:
+                try:
+                    response = self.sp.playlist_items(uri.split(":")[2], fields="items(track(uri))", limit=100)
+                    self._playlist_tracks_cache[uri] = [
+                        (entry.get("track") or {}).get("uri")
+                        for entry in response.get("items", [])
+                        if (entry.get("track") or {}).get("uri", "").startswith("spotify:track:")
+                    ]
+                except Exception:
+                    continue
+            tracks.extend(self._playlist_tracks_cache[uri])
+        return tracks
+
+    def hop_in_album(self, from_start: bool = False, state: Optional[ActionState] = None):
+        state = state or ActionState(self)
+        playback = state.playback
+        fetched_at = state.fetched_at
         if not playback or not playback.get("item"):
             return "No active playback."
 
         item = playback["item"]
-        frame = self._build_frame_from_playback(playback)
-        self.stack.append(frame)
-
         album_uri = (item.get("album") or {}).get("uri")
         if not album_uri:
-            self.stack.pop()
             return "Current track has no album URI."
 
-        if from_start:
-            self._start_playback(
-                context_uri=album_uri,
-                offset={"position": 0},
-                position_ms=0,
-            )
-            return f"Hop in start: {album_uri}"
-
-        self._start_playback(
-            context_uri=album_uri,
-            offset={"uri": item.get("uri")},
-            position_ms=playback.get("progress_ms", 0),
-        )
-        return f"Hop in: {album_uri}"
+        frame = self._build_frame_from_playback(playback, state=state)
+        with self._pushed(frame):
+            if from_start:
+                first_track = next(iter(self._album_tracks_cache.get(album_uri) or []), None)
+                played = self._start_playback_or_journal(
+                    "hop_in_album",
+                    "push",
+                    state=state,
+                    expected_item={"uri": first_track, "album": {"uri": album_uri}, "artists": item.get("artists")},
+                    context_uri=album_uri,
+                    offset={"position": 0},
+                    position_ms=0,
+                )
+                message = f"Hop in start: {album_uri}"
+            else:
+                played = self._start_playback_or_journal(
+                    "hop_in_album",
+                    "push",
+                    state=state,
+                    expected_item=item,
+                    context_uri=album_uri,
+                    offset={"uri": item.get("uri")},
+                    position_ms=playback.get("progress_ms", 0),
+                    extrapolate_from=fetched_at,
+                )
+                message = f"Hop in: {album_uri}"
+
+        self._mark_frame_left(frame, playback, fetched_at)
+        self._record_history("pushed", frame)
+        return message + _offline_note(played)
+
+    def hop_in_artist(self, radio: bool = False, state: Optional[ActionState] = None):
+        state = state or ActionState(self)
+        playback = state.playback
+        fetched_at = state.fetched_at
+        if not playback or not playback.get("item"):
+            return "No active playback."
 
-    def hop_out(self):
-        if not self.stack:
-            return "Stack is empty."
+        item = playback["item"]
+        artist = (item.get("artists") or [{}])[0]
+        artist_uri = artist.get("uri")
+        if not artist_uri:
+            return "Current track has no artist URI."
+
+        entry = self.catalog.get(artist_uri)
+        candidates = list(entry.discography if radio else entry.top_tracks)
+        if radio:
+            random.shuffle(candidates)
+        # Keep the current track playing; the artist's tracks follow it.
+        track_uri = item.get("uri")
+        uris = [track_uri] + [uri for uri in candidates if uri != track_uri][:99]
+        if len(uris) < 2:
+            return f"No tracks found for {artist.get('name') or artist_uri}."
+
+        frame = self._build_frame_from_playback(playback, state=state)
+        with self._pushed(frame):
+            played = self._start_playback_or_journal(
+                "hop_in_artist",
+                "push",
+                state=state,
+                expected_item=item,
+                uris=uris,
+                offset={"uri": track_uri},
+                position_ms=playback.get("progress_ms", 0),
+                extrapolate_from=fetched_at,
+            )
+        label = f"{'Artist radio' if radio else 'Artist'}: {artist.get('name') or 'Unknown artist'}"
+        self._set_active(uris, label)
+        self._mark_frame_left(frame, playback, fetched_at)
+        self._record_history("pushed", frame)
+        return f"Hop in {label}" + _offline_note(played)
+
+    def hop_out(self, state: Optional[ActionState] = None):
+        with self._lock:
+            # Leaving a frame whose hop in is still in flight could strand it.
+            while self.stack and id(self.stack[-1]) in self._unsettled:
+                self._settled.wait()
+            if not self.stack:
+                return "Stack is empty."
+            # Claimed up front so a concurrent hop out restores the frame below.
+            index = len(self.stack) - 1
+            frame = self.stack.pop()
 
-        frame = self.stack[-1]
+        try:
+            restored = self._restore_frame(frame, "hop_out", "pop", state=state)
+        except BaseException:
+            self._return_frames([frame], index)
+            raise
+        if not restored:
+            self._return_frames([frame], index)
+            return "Hop out failed: no resumable frame"
+        self._record_history("popped", frame)
+        return f"Hop out: {restored}"
+
+    def hop_out_to_root(self, state: Optional[ActionState] = None):
+        with self._lock:
+            while any(id(frame) in self._unsettled for frame in self.stack):
+                self._settled.wait()
+            if not self.stack:
+                return "Stack is empty."
+            frames = self.stack[:]
+            del self.stack[:]
 
+        try:
+            restored = self._restore_frame(frames[0], "hop_out_to_root", "root", state=state)
+        except BaseException:
+            self._return_frames(frames, 0)
+            raise
+        if not restored:
+            self._return_frames(frames, 0)
+            return "Hop out failed: no resumable frame"
+        for frame in reversed(frames):
+            self._record_history("popped", frame)
+        return f"Hop out to root: {restored}"
+
+    def _restore_frame(
+        self, frame: PlaybackFrame, action: str, kind: str, state: Optional[ActionState] = None
+    ) -> Optional[str]:
+        expected_item = {
+            "uri": frame.track_uri,
+            "name": frame.track_name,
+            "artists": [{"name": frame.artist_names}],
+        }
         if frame.context_uri and frame.track_uri:
-            self._start_playback(
+            played = self._start_playback_or_journal(
+                action,
+                kind,
+                state=state,
+                expected_item=expected_item,
                 context_uri=frame.context_uri,
                 offset={"uri": frame.track_uri},
                 position_ms=frame.progress_ms,
             )
-            self.stack.pop()
-            return "Hop out: resumed context"
+            return "resumed context" + _offline_note(played)
 
         if frame.resume_uris and frame.track_uri:
-            self.active_uris = frame.resume_uris
             offset_uri = frame.track_uri if frame.track_uri in frame.resume_uris else frame.resume_uris[0]
-            self._start_playback(uris=frame.resume_uris, offset={"uri": offset_uri}, position_ms=frame.progress_ms)
-            self.stack.pop()
-            return "Hop out: resumed queue snapshot"
+            played = self._start_playback_or_journal(
+                action,
+                kind,
+                state=state,
+                expected_item=expected_item,
+                uris=frame.resume_uris,
+                offset={"uri": offset_uri},
+                position_ms=frame.progress_ms,
+            )
+            self._set_active(frame.resume_uris, frame.source_label)
+            return "resumed queue snapshot" + _offline_note(played)
+
+        return None
+
+    def export_stack(self, fmt: str = "binary") -> bytes:
+        from .snapshot import encode_stack, encode_stack_json
+
+        if fmt == "json":
+            return encode_stack_json(self._stack_snapshot())
+        if fmt != "binary":
+            raise ValueError(f"Unknown stack format: {fmt}")
+        return encode_stack(self._stack_snapshot())
+
+    def import_stack(self, data: bytes) -> str:
+        from .snapshot import decode_stack
+
+        frames = decode_stack(data)
+        with self._lock:
+            self.stack = frames
+        return f"Loaded stack: {len(frames)} frames"
 
-        return "Hop out failed: no resumable frame"
+    def save_named_stack(self, name: str, fmt: str = "binary") -> str:
+        if self.stack_library is None:
+            return "No stack library configured."
+        self.stack_library.save(name, self._stack_snapshot(), fmt=fmt)
+        return f"Saved stack: {name}"
+
+    def load_named_stack(self, name: str) -> str:
+        if self.stack_library is None:
+            return "No stack library configured."
+        try:
+            frames = self.stack_library.load(name)
+        except KeyError:
+            return f"No saved stack named {name}."
+        except (OSError, ValueError) as exc:
+            return f"Could not load stack {name}: {exc}"
+        with self._lock:
+            self.stack = frames
+        return f"Loaded stack: {name} ({len(frames)} frames)"
 
     def stack_summary(self) -> List[str]:
-        if not self.stack:
+        frames = self._stack_snapshot()
+        if not frames:
             return ["(empty)"]
 
         lines = []
-        for idx, frame in enumerate(reversed(self.stack), start=1):
+        for idx, frame in enumerate(reversed(frames), start=1):
             minutes, seconds = divmod(frame.progress_ms // 1000, 60)
             lines.append(
                 f"{idx}. {frame.track_name} - {frame.artist_names} | from {frame.source_label} @ {minutes:02d}:{seconds:02d}"
             )
         return lines
+
+
+def _offline_note(played: bool) -> str:
+    return "" if played else " (offline, will replay)"
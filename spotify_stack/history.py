@@ -0,0 +1,204 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .controller import PlaybackFrame
+
+
+@dataclass
+class HistoryEntry:
+    id: int
+    event: str  # "pushed", "popped" or "observed"
+    recorded_at: float
+    frame: PlaybackFrame
+
+
+# Every query term is a prefix. Prefixes this long or shorter are read straight
+# from a prefix index; longer ones would make FTS5 merge the doclists of every
+# matching token first, which costs milliseconds on common words. Searches stay
+# under a millisecond on 100k rows except when several common terms rarely occur
+# together: FTS5 then walks most of their doclists, about 1-3 ms.
+_INDEXED_PREFIX = 6
+_FTS_PREFIX_OPTION = "prefix='1 2 3 4 5 6'"
+
+_COLUMNS = (
+    "id, event, recorded_at, context_uri, track_uri, progress_ms, resume_uris, track_name, artist_names, source_label"
+)
+
+
+# Every frame the session pushed, popped or saw playing, in a local SQLite file
+# with an FTS5 prefix index over track, artist and source label.
+class SessionHistory:
+    def __init__(self, path: str = ":memory:", clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.create_function("has_prefixes", 2, _has_prefixes, deterministic=True)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frames ("
+            " id INTEGER PRIMARY KEY,"
+            " event TEXT NOT NULL,"
+            " recorded_at REAL NOT NULL,"
+            " context_uri TEXT,"
+            " track_uri TEXT,"
+            " progress_ms INTEGER NOT NULL,"
+            " resume_uris TEXT,"
+            " track_name TEXT NOT NULL,"
+            " artist_names TEXT NOT NULL,"
+            " source_label TEXT NOT NULL"
+            ")"
+        )
+        self.full_text = self._create_fts_index()
+
+    def _create_fts_index(self) -> bool:
+        existing = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'frames_fts'").fetchone()
+        if existing and _FTS_PREFIX_OPTION not in existing[0]:
+            # Built by an older version with fewer prefix lengths; rebuilt below.
+            self._conn.execute("DROP TABLE frames_fts")
+            existing = None
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS frames_fts USING fts5("
+                " track_name, artist_names, source_label,"
+                f" content='frames', content_rowid='id', {_FTS_PREFIX_OPTION})"
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE scans.
+            return False
+        if not existing:
+            self._conn.execute("INSERT INTO frames_fts(frames_fts) VALUES ('rebuild')")
+
+        self._conn.executescript(
+            "CREATE TRIGGER IF NOT EXISTS frames_ai AFTER INSERT ON frames BEGIN"
+            " INSERT INTO frames_fts(rowid, track_name, artist_names, source_label)"
+            " VALUES (new.id, new.track_name, new.artist_names, new.source_label); END;"
+            "CREATE TRIGGER IF NOT EXISTS frames_ad AFTER DELETE ON frames BEGIN"
+            " INSERT INTO frames_fts(frames_fts, rowid, track_name, artist_names, source_label)"
+            " VALUES ('delete', old.id, old.track_name, old.artist_names, old.source_label); END;"
+        )
+        return True
+
+    def record(self, event: str, frame: PlaybackFrame) -> int:
+        with self._lock:
+            if event == "observed":
+                # The refresh loop sees the same track every few seconds; keep one
+                # row per stretch of listening and just move its progress forward.
+                last = self._conn.execute(
+                    "SELECT id, event, context_uri, track_uri FROM frames ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+                if last and last[1] == "observed" and last[2] == frame.context_uri and last[3] == frame.track_uri:
+                    self._conn.execute(
+                        "UPDATE frames SET progress_ms = ?, recorded_at = ? WHERE id = ?",
+                        (frame.progress_ms, self._clock(), last[0]),
+                    )
+                    return last[0]
+
+            cursor = self._conn.execute(
+                "INSERT INTO frames (event, recorded_at, context_uri, track_uri, progress_ms, resume_uris,"
+                " track_name, artist_names, source_label) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    event,
+                    self._clock(),
+                    frame.context_uri,
+                    frame.track_uri,
+                    frame.progress_ms,
+                    json.dumps(frame.resume_uris) if frame.resume_uris is not None else None,
+                    frame.track_name,
+                    frame.artist_names,
+                    frame.source_label,
+                ),
+            )
+            return cursor.lastrowid
+
+    def get(self, entry_id: int) -> Optional[HistoryEntry]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM frames WHERE id = ?", (entry_id,)).fetchone()
+        return _entry_from_row(row) if row else None
+
+    def recent(self, limit: int = 20) -> List[HistoryEntry]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {_COLUMNS} FROM frames ORDER BY id DESC LIMIT ?", (limit * 4,)).fetchall()
+        return _latest_per_frame(rows, limit)
+
+    def search(self, query: str, limit: int = 20) -> List[HistoryEntry]:
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return self.recent(limit)
+
+        with self._lock:
+            if self.full_text:
+                match = " AND ".join(f'"{term[:_INDEXED_PREFIX]}"*' for term in terms)
+                long_terms = " ".join(term for term in terms if len(term) > _INDEXED_PREFIX)
+                # The index matched only the first few characters of long terms;
+                # check the rest before LIMIT so misses cannot crowd out hits.
+                check = (
+                    " AND has_prefixes(track_name || ' ' || artist_names || ' ' || source_label, ?)"
+                    if long_terms
+                    else ""
+                )
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM frames JOIN"
+                    f" (SELECT rowid AS hit FROM frames_fts WHERE frames_fts MATCH ?{check} ORDER BY rowid DESC LIMIT ?)"
+                    " ON frames.id = hit ORDER BY id DESC",
+                    (match, long_terms, limit * 4) if long_terms else (match, limit * 4),
+                ).fetchall()
+            else:
+                clauses = " AND ".join(
+                    "(track_name LIKE ? OR artist_names LIKE ? OR source_label LIKE ?)" for _ in terms
+                )
+                params: list = []
+                for term in terms:
+                    params.extend([f"%{term}%"] * 3)
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM frames WHERE {clauses} ORDER BY id DESC LIMIT ?",
+                    (*params, limit * 4),
+                ).fetchall()
+        return _latest_per_frame(rows, limit)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _has_prefixes(text: str, terms: str) -> bool:
+    # Runs once per candidate row inside the query; the substring test is cheap.
+    text = text.lower()
+    return all(term in text and re.search(r"(?<!\w)" + re.escape(term), text) for term in terms.split())
+
+
+def _latest_per_frame(rows, limit: int) -> List[HistoryEntry]:
+    # Rows arrive newest first; keep the latest row per (context, track).
+    entries: List[HistoryEntry] = []
+    seen = set()
+    for row in rows:
+        key = (row[3], row[4])
+        if key in seen:
+            continue
+        seen.add(key)
+        entries.append(_entry_from_row(row))
+        if len(entries) == limit:
+            break
+    return entries
+
+
+def _entry_from_row(row) -> HistoryEntry:
+    return HistoryEntry(
+        id=row[0],
+        event=row[1],
+        recorded_at=row[2],
+        frame=PlaybackFrame(
+            context_uri=row[3],
+            track_uri=row[4],
+            progress_ms=row[5],
+            resume_uris=json.loads(row[6]) if row[6] else None,
+            track_name=row[7],
+            artist_names=row[8],
+            source_label=row[9],
+        ),
+    )
@@ -1,21 +1,216 @@
-from typing import Callable, Dict, Optional
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, FrozenSet, Optional, Tuple, Union
 
+from .actions import DEFAULT_ACTIONS
 
-KEYMAP = {
-    "f13": "previous_track",
-    "f15": "next_track",
-    "f20": "toggle_playback",
-    "f14": "hop_in_album",
-    "f19": "hop_out",
-    "f17": "queue_new_from_top_tracks",
-    "f16": "seek_back",
-    "f18": "seek_forward",
-}
+
+# Values are either an action name (fired on press) or a dict with any of
+# "press", "long_press" and "repeat" ("ignore" or "coalesce"). Keys joined with
+# "+" bind a chord. The default comes from the hotkeys declared on each action.
+KEYMAP: Dict[str, Union[str, dict]] = DEFAULT_ACTIONS.keymap()
+
+
+@dataclass
+class Keymap:
+    press: Dict[str, str] = field(default_factory=dict)
+    long_press: Dict[str, str] = field(default_factory=dict)
+    repeat: Dict[str, str] = field(default_factory=dict)
+    chords: Dict[FrozenSet[str], str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Union[str, dict]]) -> "Keymap":
+        keymap = cls()
+        for key, binding in raw.items():
+            key = key.lower()
+            if "+" in key:
+                if not isinstance(binding, str):
+                    raise ValueError(f"Chord {key} must map to an action name")
+                keymap.chords[frozenset(part.strip() for part in key.split("+"))] = binding
+                continue
+
+            if isinstance(binding, str):
+                binding = {"press": binding}
+            if binding.get("press"):
+                keymap.press[key] = binding["press"]
+            if binding.get("long_press"):
+                keymap.long_press[key] = binding["long_press"]
+            repeat = binding.get("repeat", "ignore")
+            if repeat not in ("ignore", "coalesce"):
+                raise ValueError(f"Unknown repeat policy for {key}: {repeat}")
+            keymap.repeat[key] = repeat
+        return keymap
+
+    def keys(self):
+        keys = set(self.press) | set(self.long_press)
+        for chord in self.chords:
+            keys |= chord
+        return sorted(keys)
+
+
+def load_keymap(path: Optional[str] = None) -> Keymap:
+    if not path:
+        return Keymap.from_dict(KEYMAP)
+    with open(path, encoding="utf-8") as handle:
+        return Keymap.from_dict(json.load(handle))
+
+
+@dataclass
+class _HeldKey:
+    pressed_at: float
+    consumed: bool = False
+    repeats: int = 0
+    last_flush: float = 0.0
+
+
+# Turns raw key down/up events into actions. The keyboard hook thread only
+# appends to a deque; a worker thread applies debounce, repeat coalescing,
+# chords and long presses, then calls the handlers.
+class HotkeyDispatcher:
+    def __init__(
+        self,
+        keymap: Keymap,
+        resolve_handler: Callable[[str], Optional[Callable[..., None]]],
+        debounce_ms: int = 150,
+        long_press_ms: int = 600,
+        repeat_interval_ms: int = 250,
+        max_repeat_step: int = 4,
+    ):
+        self.keymap = keymap
+        self.resolve_handler = resolve_handler
+        self.debounce_s = debounce_ms / 1000
+        self.long_press_s = long_press_ms / 1000
+        self.repeat_interval_s = repeat_interval_ms / 1000
+        self.max_repeat_step = max_repeat_step
+        self._events: Deque[Tuple[str, str, float]] = deque()
+        self._wakeup = threading.Event()
+        self._held: Dict[str, _HeldKey] = {}
+        self._last_fired: Dict[str, float] = {}
+        self._chord_keys = frozenset().union(*keymap.chords) if keymap.chords else frozenset()
+        self._mapped_keys = frozenset(keymap.keys())
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def feed(self, name: str, event_type: str, at: Optional[float] = None):
+        name = name.lower()
+        if name not in self._mapped_keys:
+            # The hook sees every key on the system; unmapped ones would count
+            # as held, keep the timer running and break chord matching.
+            return
+        self._events.append((name, event_type, time.monotonic() if at is None else at))
+        self._wakeup.set()
+
+    def start(self):
+        if self._thread:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="hotkey-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(timeout=self._next_deadline())
+            self._wakeup.clear()
+            self.process()
+
+    def _next_deadline(self) -> Optional[float]:
+        # Only wake on a timer while a key is held; otherwise sleep until an event.
+        if not self._held:
+            return None
+        return min(self.repeat_interval_s, self.long_press_s)
+
+    def process(self, now: Optional[float] = None):
+        while self._events:
+            name, event_type, at = self._events.popleft()
+            if event_type == "down":
+                self._on_down(name, at)
+            elif event_type == "up":
+                self._on_up(name, at)
+        self._on_tick(time.monotonic() if now is None else now)
+
+    def _on_down(self, name: str, at: float):
+        held = self._held.get(name)
+        if held:
+            # Auto-repeat from a held key.
+            if self.keymap.repeat.get(name) == "coalesce" and not held.consumed:
+                held.repeats += 1
+            return
+
+        held = _HeldKey(pressed_at=at, last_flush=at)
+        self._held[name] = held
+
+        chord_action = self.keymap.chords.get(frozenset(self._held))
+        if chord_action:
+            for key in self._held.values():
+                key.consumed = True
+            self._fire(chord_action, "+".join(sorted(self._held)), at)
+            return
+
+        if name in self.keymap.long_press or name in self._chord_keys:
+            # Decided on release or when the long-press timer runs out.
+            return
+        if name in self.keymap.press:
+            self._fire(self.keymap.press[name], name, at)
+
+    def _on_up(self, name: str, at: float):
+        held = self._held.pop(name, None)
+        if not held or held.consumed:
+            return
+
+        deferred = name in self.keymap.long_press or name in self._chord_keys
+        if deferred and name in self.keymap.press:
+            self._fire(self.keymap.press[name], name, at)
+        elif held.repeats:
+            self._flush_repeats(name, held, at)
+
+    def _on_tick(self, now: float):
+        for name, held in list(self._held.items()):
+            if held.consumed:
+                continue
+            if name in self.keymap.long_press and now - held.pressed_at >= self.long_press_s:
+                held.consumed = True
+                self._fire(self.keymap.long_press[name], name, now)
+            elif held.repeats and now - held.last_flush >= self.repeat_interval_s:
+                self._flush_repeats(name, held, now)
+
+    def _flush_repeats(self, name: str, held: _HeldKey, now: float):
+        # Longer holds move further per flush, up to max_repeat_step.
+        step = min(self.max_repeat_step, 1 + int(now - held.pressed_at))
+        held.repeats = 0
+        held.last_flush = now
+        self._call(self.keymap.press[name], step)
+
+    def _fire(self, action_name: str, key: str, at: float):
+        last = self._last_fired.get(key)
+        if last is not None and at - last < self.debounce_s:
+            return
+        self._last_fired[key] = at
+        if self.keymap.repeat.get(key) == "coalesce":
+            self._call(action_name, 1)
+        else:
+            self._call(action_name)
+
+    def _call(self, action_name: str, *args):
+        handler = self.resolve_handler(action_name)
+        if handler:
+            handler(*args)
 
 
 class HotkeyManager:
-    def __init__(self, handlers: Dict[str, Callable[[], None]]):
+    def __init__(self, handlers: Dict[str, Callable[..., None]], keymap: Optional[Keymap] = None):
         self.handlers = handlers
+        self.keymap = keymap or load_keymap()
+        self.dispatcher = HotkeyDispatcher(self.keymap, lambda name: self.handlers.get(name))
         self._keyboard = None
         self._hook = None
 
@@ -24,8 +219,10 @@ class HotkeyManager:
             import keyboard  # type: ignore
 
             self._keyboard = keyboard
-            self._hook = keyboard.on_press(self._on_press)
-            return "Global hotkeys active (F13/F14/F15/F16/F17/F18/F19/F20)."
+            self._hook = keyboard.hook(self._on_event)
+            self.dispatcher.start()
+            keys = "/".join(key.upper() for key in self.keymap.keys())
+            return f"Global hotkeys active ({keys})."
         except Exception as exc:
             return f"Global hotkeys unavailable: {exc}"
 
@@ -33,12 +230,9 @@ class HotkeyManager:
         if self._keyboard and self._hook:
             self._keyboard.unhook(self._hook)
             self._hook = None
+        self.dispatcher.stop()
 
-    def _on_press(self, event):
-        action_name = KEYMAP.get(event.name)
-        if not action_name:
-            return
-
-        handler = self.handlers.get(action_name)
-        if handler:
-            handler()
+    def _on_event(self, event):
+        # Runs on the keyboard library's hook thread: hand off and return.
+        if event.name:
+            self.dispatcher.feed(event.name, event.event_type)
@@ -0,0 +1,60 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+try:
+    import requests
+except ImportError:  # pragma: no cover
+    requests = None  # type: ignore
+
+
+@dataclass
+class JournalEntry:
+    action: str
+    kind: str  # "push", "pop" or "root"
+    playback: dict  # start_playback keyword arguments
+    recorded_at: float
+
+
+def is_offline_error(exc: BaseException) -> bool:
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if requests is not None:
+        return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+    return False
+
+
+# Stack intents recorded while Spotify is unreachable. The local stack is updated
+# optimistically, so only the playback target still needs to reach Spotify; on
+# replay a hop in and the hop out that undoes it cancel each other, and of what
+# remains only the final target is sent.
+class CommandJournal:
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self.entries: List[JournalEntry] = []
+
+    def record(self, action: str, kind: str, playback: dict):
+        self.entries.append(JournalEntry(action=action, kind=kind, playback=dict(playback), recorded_at=self._clock()))
+
+    def compress(self) -> List[JournalEntry]:
+        remaining: List[JournalEntry] = []
+        for entry in self.entries:
+            if entry.kind == "pop" and remaining and remaining[-1].kind == "push":
+                remaining.pop()
+            else:
+                remaining.append(entry)
+        return remaining
+
+    def net_effect(self) -> Optional[JournalEntry]:
+        remaining = self.compress()
+        return remaining[-1] if remaining else None
+
+    def clear(self):
+        self.entries = []
+
+    def drop(self, count: int):
+        # Entries recorded after a replay started stay queued for the next one.
+        self.entries = self.entries[count:]
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Iterator, MutableMapping, Optional
+
+
+DEFAULT_TTL_S = 7 * 24 * 3600
+
+
+# Host-wide metadata cache (context labels, album track lists) backed by SQLite in
+# WAL mode, so any number of processes can read while one writes at a time.
+class MetadataStore:
+    def __init__(self, path: str, ttl_s: float = DEFAULT_TTL_S, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._readers: list = []
+        self._writer = self._connect()
+        with self._write_lock, self._writer:
+            self._writer.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key)"
+                ") WITHOUT ROWID"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._write_lock:
+                self._readers.append(conn)
+        return conn
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = self._reader().execute(
+            "SELECT value FROM metadata WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, self._clock()),
+        ).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl_s: Optional[float] = None):
+        expires_at = self._clock() + (self.ttl_s if ttl_s is None else ttl_s)
+        with self._write_lock:
+            self._writer.execute(
+                "INSERT OR REPLACE INTO metadata (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at),
+            )
+
+    def delete(self, namespace: str, key: str):
+        with self._write_lock:
+            self._writer.execute("DELETE FROM metadata WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def keys(self, namespace: str):
+        rows = self._reader().execute(
+            "SELECT key FROM metadata WHERE namespace = ? AND expires_at > ?",
+            (namespace, self._clock()),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        with self._write_lock:
+            cursor = self._writer.execute("DELETE FROM metadata WHERE expires_at <= ?", (self._clock(),))
+        return cursor.rowcount
+
+    def namespace(self, name: str) -> "MetadataNamespace":
+        return MetadataNamespace(self, name)
+
+    def close(self):
+        with self._write_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+            self._writer.close()
+        self._local = threading.local()
+
+
+# Dict-like view of one namespace, so the controller can use the store anywhere it
+# would use a plain cache dict.
+class MetadataNamespace(MutableMapping[str, Any]):
+    _missing = object()
+
+    def __init__(self, store: MetadataStore, name: str):
+        self.store = store
+        self.name = name
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.store.get(self.name, key, self._missing)
+        if value is self._missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self.store.set(self.name, key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self.store.delete(self.name, key)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.store.get(self.name, key, self._missing) is not self._missing
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.keys(self.name))
+
+    def __len__(self) -> int:
+        return len(self.store.keys(self.name))
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, MutableMapping, Optional
+
+try:
+    import requests
+except ImportError:  # pragma: no cover
+    requests = None  # type: ignore
+
+from .controller import SpotifyStackController
+from .history import SessionHistory
+from .snapshot import StackLibrary
+from .metadata_store import MetadataStore
+
+
+@dataclass
+class AccountConfig:
+    name: str
+    token_cache_path: str
+    device_name: Optional[str] = None
+    history_path: Optional[str] = None
+    stacks_dir: Optional[str] = None
+
+
+@dataclass
+class AccountSession:
+    config: AccountConfig
+    sp: Any
+    controller: SpotifyStackController
+
+
+# Several accounts in one process: each gets its own client, token cache, stack
+# and device registry, while the worker threads, HTTP connections and metadata
+# cache are created once and shared.
+class ControllerPool:
+    def __init__(
+        self,
+        client_factory: Callable[[AccountConfig, Any], Any],
+        max_workers: int = 4,
+        metadata_store: Optional[MetadataStore] = None,
+    ):
+        self.client_factory = client_factory
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spotify-stack")
+        self.http_session = requests.Session() if requests else None
+        self.metadata_store = metadata_store
+        if metadata_store is not None:
+            self.metadata_cache: MutableMapping[str, Any] = metadata_store.namespace("context_labels")
+            self.album_tracks_cache: MutableMapping[str, Any] = metadata_store.namespace("album_tracks")
+        else:
+            self.metadata_cache = {}
+            self.album_tracks_cache = {}
+        self._sessions: Dict[str, AccountSession] = {}
+
+    def add_account(self, config: AccountConfig) -> AccountSession:
+        if config.name in self._sessions:
+            raise ValueError(f"Account already registered: {config.name}")
+
+        sp = self.client_factory(config, self.http_session)
+        session = AccountSession(
+            config=config,
+            sp=sp,
+            controller=SpotifyStackController(
+                sp,
+                metadata_cache=self.metadata_cache,
+                device_name=config.device_name,
+                album_tracks_cache=self.album_tracks_cache,
+                history=SessionHistory(config.history_path) if config.history_path else None,
+                stack_library=StackLibrary(config.stacks_dir) if config.stacks_dir else None,
+                executor=self.executor,
+            ),
+        )
+        self._sessions[config.name] = session
+        return session
+
+    def get(self, name: str) -> AccountSession:
+        return self._sessions[name]
+
+    def names(self) -> List[str]:
+        return list(self._sessions)
+
+    def __iter__(self) -> Iterator[AccountSession]:
+        return iter(list(self._sessions.values()))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        for session in self:
+            if session.controller.history is not None:
+                session.controller.history.close()
+        if self.http_session is not None:
+            self.http_session.close()
+        if self.metadata_store is not None:
+            self.metadata_store.close()
@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, List
+
+
+# Counters for an instrumented run: Tk callbacks, UI queue wakeups, worker
+# spawns and Spotify API calls, reported as totals and per-minute rates.
+class RunProfiler:
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._started_at = clock()
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def instrument_client(self, sp: Any) -> "InstrumentedClient":
+        return InstrumentedClient(sp, self)
+
+    def report(self) -> str:
+        elapsed = max(self._clock() - self._started_at, 1e-9)
+        minutes = elapsed / 60
+        with self._lock:
+            counts = dict(self.counts)
+
+        lines: List[str] = [f"Profile: {elapsed:.1f}s"]
+        width = max((len(name) for name in counts), default=0)
+        for name in sorted(counts, key=lambda key: (key.startswith("api:"), key)):
+            lines.append(f"  {name:<{width}}  {counts[name]:>7}  {counts[name] / minutes:>9.1f}/min")
+        return "\n".join(lines)
+
+
+class InstrumentedClient:
+    def __init__(self, sp: Any, profiler: RunProfiler):
+        self._sp = sp
+        self._profiler = profiler
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._sp, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._profiler.count("api_calls")
+            self._profiler.count(f"api:{name}")
+            return attr(*args, **kwargs)
+
+        return call
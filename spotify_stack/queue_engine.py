@@ -0,0 +1,214 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from .background import BackgroundCall
+
+DEFAULT_SOURCE_WEIGHTS = {
+    "short_term": 3.0,
+    "medium_term": 2.0,
+    "long_term": 1.0,
+    "playlists": 0.75,
+}
+
+
+# Scored candidate pool for Queue Top. Tracks that rank well in several sources
+# float to the top; sampling goes through an alias table so each draw is O(1).
+# Safe to share between threads: sources are fetched without the lock and the
+# finished tables are swapped in under it. With an executor the pool is built in
+# the background (see warm()), and an expired pool keeps being served while its
+# replacement is fetched, so only a press before the first build waits on it.
+class QueueEngine:
+    def __init__(
+        self,
+        sources: Dict[str, Callable[[], List[str]]],
+        weights: Optional[Dict[str, float]] = None,
+        pool_ttl_s: float = 30 * 60,
+        recent_frames: int = 3,
+        rng: Optional[random.Random] = None,
+        executor: Optional[Executor] = None,
+        retry_s: float = 60,
+    ):
+        self.sources = sources
+        self.weights = dict(DEFAULT_SOURCE_WEIGHTS if weights is None else weights)
+        self.pool_ttl_s = pool_ttl_s
+        self._rng = rng or random.Random()
+        self._recent: Deque[List[str]] = deque(maxlen=recent_frames)
+        self._pool: List[str] = []
+        self._scores: List[float] = []
+        self._alias: List[int] = []
+        self._prob: List[float] = []
+        self._built_at: Optional[float] = None
+        self.executor = executor
+        self.retry_s = retry_s
+        self._attempted_at: Optional[float] = None
+        self._build_call: Optional[BackgroundCall[None]] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def _stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at > self.pool_ttl_s
+
+    def warm(self) -> Optional[Future]:
+        if self.executor is None:
+            return None
+
+        with self._lock:
+            if not self._stale():
+                return None
+            if self._build_call is not None:
+                return self._build_call.future
+            if not self._pool and self._attempted_at is not None:
+                # The last build failed or came back empty; don't refetch on every refresh.
+                if time.monotonic() - self._attempted_at < self.retry_s:
+                    return None
+            call = BackgroundCall(self._build, self._forget_build)
+            self._build_call = call
+        self.executor.submit(call.run)
+        return call.future
+
+    def pool(self) -> List[str]:
+        with self._lock:
+            stale = self._stale()
+            has_pool = bool(self._pool)
+        if stale:
+            if has_pool and self.executor is not None:
+                self.warm()
+            else:
+                self._build_now()
+        with self._lock:
+            return self._pool
+
+    def _build_now(self):
+        with self._lock:
+            call = self._build_call
+        if call is not None:
+            call.result()
+        else:
+            self._build()
+
+    def _forget_build(self, call: BackgroundCall):
+        with self._lock:
+            if self._build_call is call:
+                self._build_call = None
+
+    def sample(self, k: int, exclude: Iterable[str] = ()) -> List[str]:
+        self.pool()
+        with self._lock:
+            return self._sample(k, exclude)
+
+    def _sample(self, k: int, exclude: Iterable[str]) -> List[str]:
+        pool = self._pool
+        k = min(k, len(pool))
+        if k <= 0:
+            return []
+
+        excluded: Set[str] = set(exclude)
+        for previous in self._recent:
+            excluded.update(previous)
+
+        chosen: List[str] = []
+        seen: Set[int] = set()
+        # Rejections are rare unless exclusions cover most of the pool, so cap the
+        # draws and fall through to a deterministic fill rather than spin.
+        for _ in range(4 * k + 32):
+            if len(chosen) == k:
+                break
+            idx = self._draw()
+            if idx in seen or pool[idx] in excluded:
+                continue
+            seen.add(idx)
+            chosen.append(pool[idx])
+
+        if len(chosen) < k:
+            chosen.extend(self._fill(k - len(chosen), seen, excluded))
+
+        self._recent.append(chosen)
+        return chosen
+
+    def _fill(self, count: int, seen: Set[int], excluded: Set[str]) -> List[str]:
+        # Highest-scored leftovers first; excluded tracks only when the pool would
+        # otherwise come up short.
+        ranked = sorted(
+            (idx for idx in range(len(self._pool)) if idx not in seen),
+            key=lambda idx: self._scores[idx],
+            reverse=True,
+        )
+        preferred = [idx for idx in ranked if self._pool[idx] not in excluded]
+        fallback = [idx for idx in ranked if self._pool[idx] in excluded]
+        picked = (preferred + fallback)[:count]
+        seen.update(picked)
+        self._rng.shuffle(picked)
+        return [self._pool[idx] for idx in picked]
+
+    def _draw(self) -> int:
+        column = self._rng.randrange(len(self._prob))
+        if self._rng.random() < self._prob[column]:
+            return column
+        return self._alias[column]
+
+    def _build(self):
+        with self._lock:
+            self._attempted_at = time.monotonic()
+        scores: Dict[str, float] = {}
+        errors: List[Exception] = []
+        for name, fetch in self.sources.items():
+            weight = self.weights.get(name, 1.0)
+            if weight <= 0:
+                continue
+            try:
+                uris = fetch() or []
+            except Exception as exc:
+                errors.append(exc)
+                continue
+            total = len(uris)
+            for rank, uri in enumerate(uris):
+                if uri:
+                    scores[uri] = scores.get(uri, 0.0) + weight * (1.0 - 0.5 * rank / total)
+
+        if not scores and errors and len(errors) == len(self.sources):
+            raise errors[-1]
+
+        pool = list(scores)
+        weights = [scores[uri] for uri in pool]
+        prob, alias = _build_alias_table(weights)
+        with self._lock:
+            self._pool = pool
+            self._scores = weights
+            self._prob, self._alias = prob, alias
+            # An empty pool is not worth caching; the next Queue Top should retry.
+            self._built_at = time.monotonic() if pool else None
+
+
+def _build_alias_table(weights: List[float]) -> Tuple[List[float], List[int]]:
+    count = len(weights)
+    if count == 0:
+        return [], []
+
+    total = sum(weights)
+    scaled = [weight * count / total for weight in weights]
+    prob = [0.0] * count
+    alias = list(range(count))
+    small = [idx for idx, value in enumerate(scaled) if value < 1.0]
+    large = [idx for idx, value in enumerate(scaled) if value >= 1.0]
+
+    while small and large:
+        low = small.pop()
+        high = large.pop()
+        prob[low] = scaled[low]
+        alias[low] = high
+        scaled[high] = scaled[high] + scaled[low] - 1.0
+        if scaled[high] < 1.0:
+            small.append(high)
+        else:
+            large.append(high)
+
+    for idx in small + large:
+        prob[idx] = 1.0
+    return prob, alias
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+# Shifts below this are inaudible; skipping them keeps positions stable.
+MIN_COMPENSATION_MS = 250
+# Beyond this the playback snapshot is too old to extrapolate from.
+MAX_EXTRAPOLATION_MS = 15_000
+DRIFT_TOLERANCE_MS = 750
+RESTORE_CHECK_WINDOW_S = 10.0
+
+
+class LatencyEstimator:
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.rtt_ms: Optional[float] = None
+
+    def observe(self, rtt_ms: float):
+        if self.rtt_ms is None:
+            self.rtt_ms = rtt_ms
+        else:
+            self.rtt_ms += self.alpha * (rtt_ms - self.rtt_ms)
+
+    def one_way_ms(self) -> int:
+        return int(self.rtt_ms / 2) if self.rtt_ms is not None else 0
+
+
+@dataclass
+class PendingRestore:
+    track_uri: str
+    target_ms: int
+    landed_at: float  # monotonic estimate of when Spotify applied the command
+    expires_at: float
+
+
+def extrapolate_progress(progress_ms: int, elapsed_ms: float, duration_ms: Optional[int] = None) -> int:
+    if elapsed_ms < MIN_COMPENSATION_MS or elapsed_ms > MAX_EXTRAPOLATION_MS:
+        return progress_ms
+    target = progress_ms + int(elapsed_ms)
+    if duration_ms:
+        target = min(target, duration_ms)
+    return target
+
+
+def measure_drift(pending: PendingRestore, playback: dict, sampled_at: float) -> Optional[int]:
+    # Expected position at the moment Spotify sampled this playback state.
+    item = playback.get("item") or {}
+    if item.get("uri") != pending.track_uri:
+        return None
+    expected = pending.target_ms
+    if playback.get("is_playing"):
+        expected += max(0, int((sampled_at - pending.landed_at) * 1000))
+    return playback.get("progress_ms", 0) - expected
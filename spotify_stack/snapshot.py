@@ -0,0 +1,277 @@
+import json
+import os
+import re
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from .controller import PlaybackFrame
+
+
+MAGIC = b"SSTK"
+VERSION = 1
+JSON_VERSION = 1
+
+_BASE62 = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_BASE62_INDEX = {char: idx for idx, char in enumerate(_BASE62)}
+_TRACK_PREFIX = "spotify:track:"
+_TRACK_ID = re.compile(r"^[0-9A-Za-z]{22}$")
+
+_HAS_CONTEXT = 0x01
+_HAS_TRACK = 0x02
+_HAS_RESUME = 0x04
+
+_URI_TRACK_ID = 0
+_URI_STRING = 1
+
+
+# Binary layout (version 1), all integers as unsigned LEB128 varints:
+#   "SSTK" version
+#   string count, then each string as length + UTF-8 bytes
+#   frame count, then per frame:
+#     flags, [context string ref], [track uri], progress_ms,
+#     [resume count + uris], track_name ref, artist_names ref, source_label ref
+# A uri is tag 0 + the 16-byte base62 track id, or tag 1 + a string ref.
+def encode_stack(frames: List[PlaybackFrame]) -> bytes:
+    strings: Dict[str, int] = {}
+
+    def ref(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    body = bytearray()
+    _write_varint(body, len(frames))
+    for frame in frames:
+        flags = 0
+        if frame.context_uri is not None:
+            flags |= _HAS_CONTEXT
+        if frame.track_uri is not None:
+            flags |= _HAS_TRACK
+        if frame.resume_uris is not None:
+            flags |= _HAS_RESUME
+        body.append(flags)
+
+        if frame.context_uri is not None:
+            _write_varint(body, ref(frame.context_uri))
+        if frame.track_uri is not None:
+            _write_uri(body, frame.track_uri, ref)
+        _write_varint(body, max(0, frame.progress_ms))
+        if frame.resume_uris is not None:
+            _write_varint(body, len(frame.resume_uris))
+            for uri in frame.resume_uris:
+                _write_uri(body, uri, ref)
+        _write_varint(body, ref(frame.track_name))
+        _write_varint(body, ref(frame.artist_names))
+        _write_varint(body, ref(frame.source_label))
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_varint(out, len(strings))
+    for value in strings:
+        encoded = value.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out += encoded
+    return bytes(out + body)
+
+
+def encode_stack_json(frames: List[PlaybackFrame]) -> bytes:
+    payload = {"version": JSON_VERSION, "frames": [asdict(frame) for frame in frames]}
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+
+def decode_stack(data: bytes) -> List[PlaybackFrame]:
+    if data[:1] == b"{":
+        return _decode_json(data)
+    if data[:4] != MAGIC:
+        raise ValueError("Not a stack snapshot")
+    if len(data) < 5 or data[4] != VERSION:
+        raise ValueError(f"Unsupported stack snapshot version: {data[4] if len(data) > 4 else None}")
+
+    try:
+        return _decode_binary(data)
+    except (IndexError, UnicodeDecodeError) as exc:
+        raise ValueError("Corrupt stack snapshot") from exc
+
+
+def _decode_binary(data: bytes) -> List[PlaybackFrame]:
+    pos = 5
+    count, pos = _read_varint(data, pos)
+    strings: List[str] = []
+    for _ in range(count):
+        length, pos = _read_varint(data, pos)
+        if pos + length > len(data):
+            raise IndexError("string runs past end of snapshot")
+        strings.append(data[pos : pos + length].decode("utf-8"))
+        pos += length
+
+    frames: List[PlaybackFrame] = []
+    frame_count, pos = _read_varint(data, pos)
+    for _ in range(frame_count):
+        flags = data[pos]
+        pos += 1
+
+        context_uri = track_uri = None
+        resume_uris: Optional[List[str]] = None
+        if flags & _HAS_CONTEXT:
+            idx, pos = _read_varint(data, pos)
+            context_uri = strings[idx]
+        if flags & _HAS_TRACK:
+            track_uri, pos = _read_uri(data, pos, strings)
+        progress_ms, pos = _read_varint(data, pos)
+        if flags & _HAS_RESUME:
+            resume_count, pos = _read_varint(data, pos)
+            resume_uris = []
+            for _ in range(resume_count):
+                uri, pos = _read_uri(data, pos, strings)
+                resume_uris.append(uri)
+        names = []
+        for _ in range(3):
+            idx, pos = _read_varint(data, pos)
+            names.append(strings[idx])
+
+        frames.append(
+            PlaybackFrame(
+                context_uri=context_uri,
+                track_uri=track_uri,
+                progress_ms=progress_ms,
+                resume_uris=resume_uris,
+                track_name=names[0],
+                artist_names=names[1],
+                source_label=names[2],
+            )
+        )
+    return frames
+
+
+def _decode_json(data: bytes) -> List[PlaybackFrame]:
+    try:
+        payload = json.loads(data.decode("utf-8"))
+    except ValueError as exc:
+        raise ValueError("Corrupt stack snapshot") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("Corrupt stack snapshot")
+    if payload.get("version") != JSON_VERSION:
+        raise ValueError(f"Unsupported stack snapshot version: {payload.get('version')}")
+    frames = payload.get("frames", [])
+    if not isinstance(frames, list):
+        raise ValueError("Corrupt stack snapshot")
+    return [_frame_from_json(frame) for frame in frames]
+
+
+_JSON_FIELDS = {
+    "context_uri": (str, type(None)),
+    "track_uri": (str, type(None)),
+    "progress_ms": int,
+    "resume_uris": (list, type(None)),
+    "track_name": str,
+    "artist_names": str,
+    "source_label": str,
+}
+
+
+def _frame_from_json(frame) -> PlaybackFrame:
+    if not isinstance(frame, dict) or set(frame) != set(_JSON_FIELDS):
+        raise ValueError("Corrupt stack snapshot: bad frame fields")
+    for field, types in _JSON_FIELDS.items():
+        if not isinstance(frame[field], types) or isinstance(frame[field], bool):
+            raise ValueError(f"Corrupt stack snapshot: bad {field}")
+    if frame["resume_uris"] is not None and not all(isinstance(uri, str) for uri in frame["resume_uris"]):
+        raise ValueError("Corrupt stack snapshot: bad resume_uris")
+    return PlaybackFrame(**frame)
+
+
+def _write_varint(out: bytearray, value: int):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_uri(out: bytearray, uri: str, ref):
+    track_id = uri[len(_TRACK_PREFIX) :] if uri.startswith(_TRACK_PREFIX) else ""
+    if _TRACK_ID.match(track_id):
+        value = 0
+        for char in track_id:
+            value = value * 62 + _BASE62_INDEX[char]
+        if value < 1 << 128:
+            out.append(_URI_TRACK_ID)
+            out += value.to_bytes(16, "big")
+            return
+    out.append(_URI_STRING)
+    _write_varint(out, ref(uri))
+
+
+def _read_uri(data: bytes, pos: int, strings: List[str]) -> Tuple[str, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _URI_STRING:
+        idx, pos = _read_varint(data, pos)
+        return strings[idx], pos
+    if tag != _URI_TRACK_ID or pos + 16 > len(data):
+        raise IndexError("bad uri tag")
+
+    value = int.from_bytes(data[pos : pos + 16], "big")
+    chars = []
+    for _ in range(22):
+        value, digit = divmod(value, 62)
+        chars.append(_BASE62[digit])
+    return _TRACK_PREFIX + "".join(reversed(chars)), pos + 16
+
+
+# Named stacks saved as files in one directory: "<name>.stack" (binary) or
+# "<name>.json" (debug fallback).
+class StackLibrary:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, name: str, extension: str) -> str:
+        if not re.match(r"^[\w .-]+$", name) or name.startswith("."):
+            raise ValueError(f"Invalid stack name: {name!r}")
+        return os.path.join(self.directory, f"{name}{extension}")
+
+    def save(self, name: str, frames: List[PlaybackFrame], fmt: str = "binary") -> str:
+        if fmt not in ("binary", "json"):
+            raise ValueError(f"Unknown stack format: {fmt}")
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name, ".stack" if fmt == "binary" else ".json")
+        data = encode_stack(frames) if fmt == "binary" else encode_stack_json(frames)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+        # One file per name, so load() never finds an older save in the other format.
+        stale = self._path(name, ".json" if fmt == "binary" else ".stack")
+        if os.path.exists(stale):
+            os.remove(stale)
+        return path
+
+    def load(self, name: str) -> List[PlaybackFrame]:
+        for extension in (".stack", ".json"):
+            path = self._path(name, extension)
+            if os.path.exists(path):
+                with open(path, "rb") as handle:
+                    return decode_stack(handle.read())
+        raise KeyError(name)
+
+    def names(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            {os.path.splitext(entry)[0] for entry in os.listdir(self.directory) if entry.endswith((".stack", ".json"))}
+        )
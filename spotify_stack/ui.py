@@ -1,10 +1,18 @@
 import tkinter as tk
 import queue
 import threading
+from concurrent.futures import Executor
 from tkinter import ttk
 from typing import Callable, Dict, Optional
 
+from .actions import DEFAULT_ACTIONS, ActionRegistry
 from .controller import SpotifyStackController
+from .profiling import RunProfiler
+
+
+PUMP_INTERVAL_MS = 100
+REFRESH_PLAYING_MS = 3000
+REFRESH_IDLE_MS = 15000
 
 
 class SpotifyStackApp:
@@ -13,13 +21,20 @@ class SpotifyStackApp:
         root: tk.Tk,
         controller: SpotifyStackController,
         enable_hotkeys: bool = False,
-        register_hotkeys: Optional[Callable[[Dict[str, Callable[[], None]]], str]] = None,
+        register_hotkeys: Optional[Callable[[Dict[str, Callable[..., None]]], str]] = None,
+        executor: Optional[Executor] = None,
+        account_name: Optional[str] = None,
+        profiler: Optional[RunProfiler] = None,
+        actions: ActionRegistry = DEFAULT_ACTIONS,
     ):
         self.root = root
         self.controller = controller
+        self.actions = actions
+        self.executor = executor
+        self.profiler = profiler
 
-        self.root.title("Spotify Stack Player")
-        self.root.geometry("750x400")
+        self.root.title(f"Spotify Stack Player - {account_name}" if account_name else "Spotify Stack Player")
+        self.root.geometry("750x520")
         self.root.minsize(750, 400)
         self.root.configure(padx=10, pady=10)
 
@@ -30,9 +45,16 @@ class SpotifyStackApp:
         self._ui_queue: queue.Queue = queue.Queue()
         self._refresh_inflight = False
         self._refresh_pending = False
+        # At most one timed refresh is armed; starting any refresh cancels it.
+        self._refresh_after_id = None
+        self.search_var = tk.StringVar()
+        self._search_results = []
+        # Worker bookkeeping lives on the Tk thread only. The queue is pumped
+        # while workers are outstanding, so an idle app schedules nothing.
+        self._pending_workers = 0
+        self._pump_scheduled = False
 
         self._build_ui()
-        self._pump_ui_queue()
 
         if enable_hotkeys and register_hotkeys:
             self._enable_hotkeys(register_hotkeys)
@@ -40,18 +62,11 @@ class SpotifyStackApp:
         self._request_refresh()
 
     def _enable_hotkeys(self, register_hotkeys):
-        handlers = {
-            "previous_track": lambda: self.root.after(0, lambda: self._run_action(self.controller.previous_track)),
-            "next_track": lambda: self.root.after(0, lambda: self._run_action(self.controller.next_track)),
-            "toggle_playback": lambda: self.root.after(0, lambda: self._run_action(self.controller.toggle_playback)),
-            "hop_in_album": lambda: self.root.after(0, lambda: self._run_action(self.controller.hop_in_album)),
-            "hop_out": lambda: self.root.after(0, lambda: self._run_action(self.controller.hop_out)),
-            "queue_new_from_top_tracks": lambda: self.root.after(
-                0, lambda: self._run_action(self.controller.queue_new_from_top_tracks)
-            ),
-            "seek_back": lambda: self.root.after(0, lambda: self._run_action(lambda: self.controller.seek_relative(-10))),
-            "seek_forward": lambda: self.root.after(0, lambda: self._run_action(lambda: self.controller.seek_relative(10))),
-        }
+        def handler(name):
+            # Held keys with a coalesce policy pass a repeat count.
+            return lambda count=1: self.root.after(0, lambda: self._run_registered(name, count))
+
+        handlers = {action.name: handler(action.name) for action in self.actions}
 
         status = register_hotkeys(handlers)
         self.status_var.set(status)
@@ -80,45 +95,40 @@ class SpotifyStackApp:
         controls = ttk.Frame(self.root, padding=(4, 6))
         controls.pack(fill="x")
 
-        buttons = [
-            ("⏮ Prev", self.controller.previous_track),
-            ("⏯ Play/Pause", self.controller.toggle_playback),
-            ("Next ⏭", self.controller.next_track),
-            ("⌁ Queue Top", self.controller.queue_new_from_top_tracks),
-            ("⏪/+10 Split", None),
-            ("↳ Hop In Here", self.controller.hop_in_album),
-            ("↳ Hop In Start", lambda: self.controller.hop_in_album(from_start=True)),
-            ("↲ Hop Out", self.controller.hop_out),
-        ]
+        # Consecutive actions in the same group share one split cell.
+        cells = []
+        for action in self.actions.buttons():
+            if action.group and cells and cells[-1][0].group == action.group:
+                cells[-1].append(action)
+            else:
+                cells.append([action])
 
         for col in range(4):
             controls.grid_columnconfigure(col, weight=1)
-        for idx, (text, action) in enumerate(buttons):
+        for idx, cell in enumerate(cells):
             row = idx // 4
             col = idx % 4
-            if text == "⏪/+10 Split":
+            if len(cell) > 1:
                 split = ttk.Frame(controls)
                 split.grid(row=row, column=col, padx=6, pady=6, sticky="ew")
-                split.grid_columnconfigure(0, weight=1)
-                split.grid_columnconfigure(1, weight=1)
-                ttk.Button(
-                    split,
-                    text="-10s",
-                    command=lambda: self._run_action(lambda: self.controller.seek_relative(-10)),
-                ).grid(row=0, column=0, sticky="ew")
-                ttk.Button(
-                    split,
-                    text="+10s",
-                    command=lambda: self._run_action(lambda: self.controller.seek_relative(10)),
-                ).grid(row=0, column=1, sticky="ew")
+                for part, action in enumerate(cell):
+                    split.grid_columnconfigure(part, weight=1)
+                    ttk.Button(
+                        split,
+                        text=action.label,
+                        command=lambda name=action.name: self._run_registered(name),
+                    ).grid(row=0, column=part, sticky="ew")
             else:
                 ttk.Button(
                     controls,
-                    text=text,
+                    text=cell[0].label,
                     width=16,
-                    command=lambda a=action: self._run_action(a),
+                    command=lambda name=cell[0].name: self._run_registered(name),
                 ).grid(row=row, column=col, padx=6, pady=6, sticky="ew")
 
+        if self.controller.history is not None:
+            self._build_history_search()
+
         middle = ttk.Frame(self.root, padding=(4, 4))
         middle.pack(fill="both", expand=True)
 
@@ -154,7 +164,60 @@ class SpotifyStackApp:
             font=("Avenir Next", 10),
         ).pack(fill="x")
 
+    def _build_history_search(self):
+        search = ttk.Frame(self.root, padding=(4, 2))
+        search.pack(fill="x")
+        search.grid_columnconfigure(1, weight=1)
+
+        ttk.Label(search, text="Hop Back").grid(row=0, column=0, padx=(0, 6), sticky="w")
+        entry = ttk.Entry(search, textvariable=self.search_var)
+        entry.grid(row=0, column=1, sticky="ew")
+        entry.bind("<KeyRelease>", lambda _event: self._update_search_results())
+        entry.bind("<Return>", lambda _event: self._restore_search_result(0))
+
+        self.search_list = tk.Listbox(
+            search,
+            height=4,
+            activestyle="none",
+            bd=0,
+            highlightthickness=1,
+            font=("Menlo", 11),
+        )
+        self.search_list.grid(row=1, column=0, columnspan=2, pady=(4, 0), sticky="ew")
+        self.search_list.bind("<Double-Button-1>", lambda _event: self._restore_selected_result())
+        self.search_list.bind("<Return>", lambda _event: self._restore_selected_result())
+
+    def _update_search_results(self):
+        # Local indexed lookup, fast enough to run on every keystroke.
+        self._search_results = self.controller.search_history(self.search_var.get(), limit=8)
+        self.search_list.delete(0, tk.END)
+        for entry in self._search_results:
+            frame = entry.frame
+            minutes, seconds = divmod(frame.progress_ms // 1000, 60)
+            self.search_list.insert(
+                tk.END, f"{frame.track_name} - {frame.artist_names} | {frame.source_label} @ {minutes:02d}:{seconds:02d}"
+            )
+
+    def _restore_selected_result(self):
+        selection = self.search_list.curselection()
+        if selection:
+            self._restore_search_result(selection[0])
+
+    def _restore_search_result(self, index: int):
+        if index >= len(self._search_results):
+            return
+        entry_id = self._search_results[index].id
+        self._run_action(lambda: self.controller.restore_history_entry(entry_id))
+
+    def _count(self, name: str):
+        if self.profiler is not None:
+            self.profiler.count(name)
+
+    def _run_registered(self, name: str, count: int = 1):
+        self._run_action(lambda: self.actions.run(self.controller, name, count=count))
+
     def _run_action(self, action):
+        self._count("tk_callback")
         self.status_var.set("Working...")
 
         def worker():
@@ -164,16 +227,42 @@ class SpotifyStackApp:
             except Exception as exc:
                 self._ui_queue.put(("action_err", str(exc)))
 
-        threading.Thread(target=worker, daemon=True).start()
+        self._spawn(worker)
+
+    def _spawn(self, worker):
+        self._count("thread_spawn")
+        self._pending_workers += 1
+
+        def run():
+            try:
+                worker()
+            finally:
+                self._ui_queue.put(("worker_done", None))
+
+        if self.executor is not None:
+            self.executor.submit(run)
+        else:
+            threading.Thread(target=run, daemon=True).start()
+        self._schedule_pump()
+
+    def _schedule_pump(self):
+        if not self._pump_scheduled:
+            self._pump_scheduled = True
+            self.root.after(PUMP_INTERVAL_MS, self._pump_ui_queue)
 
     def _pump_ui_queue(self):
+        self._pump_scheduled = False
+        self._count("tk_callback")
+        self._count("queue_wakeup")
         while True:
             try:
                 event, payload = self._ui_queue.get_nowait()
             except queue.Empty:
                 break
 
-            if event == "action_ok":
+            if event == "worker_done":
+                self._pending_workers -= 1
+            elif event == "action_ok":
                 self.status_var.set(payload)
                 self._request_refresh(force=True)
             elif event == "action_err":
@@ -187,8 +276,12 @@ class SpotifyStackApp:
                 if self._refresh_pending:
                     self._refresh_pending = False
                     self._request_refresh()
+                else:
+                    # Keep polling so a dropped connection is noticed coming back.
+                    self._schedule_refresh(REFRESH_IDLE_MS)
 
-        self.root.after(100, self._pump_ui_queue)
+        if self._pending_workers > 0:
+            self._schedule_pump()
 
     def _apply_refresh_state(self, data):
         playback = data.get("playback")
@@ -228,9 +321,27 @@ class SpotifyStackApp:
             self._refresh_pending = False
             self._request_refresh()
         else:
-            self.root.after(3000, self._request_refresh)
+            # Poll less often when nothing is playing.
+            playing = bool(playback and playback.get("is_playing"))
+            self._schedule_refresh(REFRESH_PLAYING_MS if playing else REFRESH_IDLE_MS)
+
+    def _schedule_refresh(self, delay_ms: int):
+        self._cancel_scheduled_refresh()
+        self._refresh_after_id = self.root.after(delay_ms, self._scheduled_refresh)
+
+    def _cancel_scheduled_refresh(self):
+        if self._refresh_after_id is not None:
+            self.root.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+
+    def _scheduled_refresh(self):
+        self._refresh_after_id = None
+        self._request_refresh()
 
     def _request_refresh(self, force: bool = False):
+        self._count("tk_callback")
+        # Whatever starts now arms the next timed refresh when it completes.
+        self._cancel_scheduled_refresh()
         if self._refresh_inflight:
             self._refresh_pending = True
             return
@@ -240,6 +351,7 @@ class SpotifyStackApp:
         def worker():
             try:
                 playback = self.controller.current_playback()
+                self.controller.observe_playback(playback)
                 stack_lines = self.controller.stack_summary()
                 stack_depth = len(self.controller.stack)
                 self._ui_queue.put(
@@ -256,4 +368,4 @@ class SpotifyStackApp:
             except Exception as exc:
                 self._ui_queue.put(("refresh_err", str(exc)))
 
-        threading.Thread(target=worker, daemon=True).start()
+        self._spawn(worker)
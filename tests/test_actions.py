@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import Mock
+
+from spotify_stack.actions import DEFAULT_ACTIONS, Action, ActionRegistry
+from spotify_stack.controller import SpotifyStackController
+
+
+class ActionRegistryTests(unittest.TestCase):
+    def make_sp(self):
+        sp = Mock()
+        sp.current_playback.return_value = {
+            "is_playing": True,
+            "progress_ms": 42000,
+            "context": {"uri": "spotify:playlist:abc"},
+            "device": {"id": "dev123"},
+            "item": {
+                "uri": "spotify:track:t1",
+                "duration_ms": 180000,
+                "album": {"uri": "spotify:album:a1"},
+                "artists": [{"name": "A"}],
+                "name": "Track 1",
+            },
+        }
+        sp.playlist.return_value = {"name": "My Playlist"}
+        sp.queue.return_value = {"currently_playing": {"uri": "spotify:track:t1"}, "queue": []}
+        sp.album_tracks.return_value = {"items": [{"uri": "spotify:track:t1"}, {"uri": "spotify:track:t2"}]}
+        return sp
+
+    def test_default_keymap_is_generated_from_actions(self):
+        self.assertEqual(
+            DEFAULT_ACTIONS.keymap(),
+            {
+                "f13": "previous_track",
+                "f20": "toggle_playback",
+                "f15": "next_track",
+                "f17": "queue_new_from_top_tracks",
+                "f16": {"press": "seek_back", "repeat": "coalesce"},
+                "f18": {"press": "seek_forward", "repeat": "coalesce"},
+                "f14": "hop_in_album",
+                "f19": {"press": "hop_out", "long_press": "hop_out_to_root"},
+            },
+        )
+
+    def test_hop_in_fetches_playback_once(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+
+        result = DEFAULT_ACTIONS.run(controller, "hop_in_album")
+
+        self.assertEqual(result, "Hop in: spotify:album:a1")
+        sp.current_playback.assert_called_once()
+        sp.queue.assert_called_once()
+
+    def test_state_is_fetched_only_when_read(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+
+        self.assertEqual(DEFAULT_ACTIONS.run(controller, "hop_out"), "Stack is empty.")
+        sp.current_playback.assert_not_called()
+
+        sp.current_playback.return_value = None
+        self.assertEqual(DEFAULT_ACTIONS.run(controller, "hop_in_album"), "No active playback.")
+        sp.queue.assert_not_called()
+        sp.devices.assert_not_called()
+
+    def test_batch_shares_device_lookup(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+
+        results = DEFAULT_ACTIONS.run_batch(controller, ["next_track", "next_track", "hop_out"])
+
+        self.assertEqual(results, ["Skipped", "Skipped", "Stack is empty."])
+        sp.current_playback.assert_called_once()
+        self.assertEqual(sp.next_track.call_count, 2)
+
+    def test_coalesced_count_scales_seek(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+
+        result = DEFAULT_ACTIONS.run(controller, "seek_forward", count=3)
+
+        self.assertEqual(result, "Seeked to 72s")
+
+    def test_custom_action_gets_declared_state(self):
+        registry = ActionRegistry()
+        seen = []
+
+        @registry.action("album_position", "Album Position", needs=frozenset({"album_tracks"}), changes_playback=False)
+        def album_position(controller, state, count):
+            seen.append(state.album_tracks)
+            return f"Track {state.album_tracks.index(state.playback['item']['uri']) + 1}"
+
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+
+        results = registry.run_batch(controller, ["album_position", "album_position"])
+
+        self.assertEqual(results, ["Track 1", "Track 1"])
+        sp.current_playback.assert_called_once()
+        sp.album_tracks.assert_called_once()
+
+    def test_rejects_duplicates_and_unknown_needs(self):
+        registry = ActionRegistry([Action(name="a", label="A", run=Mock())])
+
+        with self.assertRaises(ValueError):
+            registry.register(Action(name="a", label="A", run=Mock()))
+        with self.assertRaises(ValueError):
+            registry.register(Action(name="b", label="B", run=Mock(), needs=frozenset({"lyrics"})))
+        with self.assertRaises(KeyError):
+            registry.get("missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from spotify_stack.background import BackgroundCall
+
+
+class BackgroundCallTests(unittest.TestCase):
+    def test_queued_call_runs_inline_and_once(self):
+        fn = Mock(return_value="done")
+        on_done = Mock()
+        call = BackgroundCall(fn, on_done)
+
+        self.assertEqual(call.result(), "done")
+        on_done.assert_called_once_with(call)
+
+        # The worker finally gets to it and finds it taken over.
+        call.run()
+        fn.assert_called_once()
+        on_done.assert_called_once()
+
+    def test_running_call_is_waited_for(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return "done"
+
+        call = BackgroundCall(fn, Mock())
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(call.run)
+            self.assertTrue(started.wait(timeout=5))
+            release.set()
+            self.assertEqual(call.result(), "done")
+
+        self.assertEqual(calls, [1])
+
+    def test_failure_reaches_the_waiting_caller(self):
+        call = BackgroundCall(Mock(side_effect=RuntimeError("boom")), Mock())
+        call.run()
+
+        with self.assertRaises(RuntimeError):
+            call.result()
+
+
+if __name__ == "__main__":
+    unittest.main()
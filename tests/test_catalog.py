@@ -0,0 +1,106 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from spotify_stack.catalog import ArtistCatalog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ArtistCatalogTests(unittest.TestCase):
+    def make_sp(self):
+        sp = Mock()
+        sp.artist_top_tracks.side_effect = lambda artist_id: {"tracks": [{"uri": f"spotify:track:{artist_id}-top"}]}
+        sp.artist_albums.return_value = {
+            "items": [
+                {"uri": "spotify:album:old", "name": "Debut", "release_date": "2001-05-01"},
+                {"uri": "spotify:album:new", "name": "Latest", "release_date": "2022-03-04"},
+                {"uri": "spotify:album:new-intl", "name": "LATEST", "release_date": "2022-03-04"},
+            ]
+        }
+        return sp
+
+    def album_tracks(self, album_uri):
+        return [f"{album_uri}-1", f"{album_uri}-2", "spotify:track:shared"]
+
+    def test_builds_discography_newest_first_without_duplicate_editions(self):
+        catalog = ArtistCatalog(self.make_sp(), self.album_tracks)
+
+        entry = catalog.get("spotify:artist:ar1")
+
+        self.assertEqual(entry.top_tracks, ["spotify:track:ar1-top"])
+        self.assertEqual(
+            entry.discography,
+            [
+                "spotify:album:new-1",
+                "spotify:album:new-2",
+                "spotify:track:shared",
+                "spotify:album:old-1",
+                "spotify:album:old-2",
+            ],
+        )
+
+    def test_evicts_least_recently_used_artist(self):
+        sp = self.make_sp()
+        catalog = ArtistCatalog(sp, self.album_tracks, max_artists=2)
+
+        catalog.get("spotify:artist:a")
+        catalog.get("spotify:artist:b")
+        catalog.get("spotify:artist:a")
+        catalog.get("spotify:artist:c")
+
+        self.assertEqual(len(catalog), 2)
+        self.assertIn("spotify:artist:a", catalog)
+        self.assertNotIn("spotify:artist:b", catalog)
+        self.assertEqual(sp.artist_top_tracks.call_count, 3)
+
+    def test_stale_entry_is_served_while_refreshing_in_background(self):
+        sp = self.make_sp()
+        clock = FakeClock()
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        catalog = ArtistCatalog(sp, self.album_tracks, executor=executor, ttl_s=60, clock=clock)
+        first = catalog.get("spotify:artist:a")
+
+        self.assertIsNone(catalog.prefetch("spotify:artist:a"))
+        clock.now += 61
+        sp.artist_top_tracks.side_effect = lambda artist_id: {"tracks": [{"uri": "spotify:track:fresh"}]}
+
+        self.assertIs(catalog.get("spotify:artist:a"), first)
+        future = catalog.prefetch("spotify:artist:a")
+        refreshed = future.result(timeout=1) if future else catalog.peek("spotify:artist:a")
+        self.assertEqual(refreshed.top_tracks, ["spotify:track:fresh"])
+        self.assertEqual(catalog.get("spotify:artist:a").top_tracks, ["spotify:track:fresh"])
+
+    def test_get_fetches_inline_when_prefetch_is_still_queued(self):
+        sp = self.make_sp()
+        queued = []
+        executor = Mock()
+        executor.submit.side_effect = lambda fn, *args: queued.append((fn, args))
+        catalog = ArtistCatalog(sp, self.album_tracks, executor=executor)
+        catalog.prefetch("spotify:artist:a")
+
+        # The worker that would run the prefetch is busy; get() must not wait on it.
+        entry = catalog.get("spotify:artist:a")
+
+        self.assertEqual(entry.top_tracks, ["spotify:track:a-top"])
+        fn, args = queued[0]
+        fn(*args)
+        self.assertEqual(sp.artist_top_tracks.call_count, 1)
+
+    def test_prefetch_without_executor_does_nothing(self):
+        sp = self.make_sp()
+        catalog = ArtistCatalog(sp, self.album_tracks)
+
+        self.assertIsNone(catalog.prefetch("spotify:artist:a"))
+        sp.artist_top_tracks.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
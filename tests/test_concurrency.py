@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from spotify_stack.controller import SpotifyStackController
+
+
+# Stateful stand-in for spotipy that sleeps a random few ms on every call, so
+# worker threads interleave at the points where real network calls would yield.
+class FakeSpotify:
+    def __init__(self, seed=0, max_latency_s=0.003, failure_rate=0.0, offline_rate=0.0):
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.max_latency_s = max_latency_s
+        self.failure_rate = failure_rate
+        self.offline_rate = offline_rate
+        self.context_uri = "spotify:playlist:p0"
+        self.track_uri = "spotify:track:t00"
+        self.started = []
+        self.before_start = None
+
+    def _call(self):
+        with self._lock:
+            delay = self._rng.uniform(0, self.max_latency_s)
+            roll = self._rng.random()
+        time.sleep(delay)
+        return roll
+
+    def current_playback(self):
+        self._call()
+        with self._lock:
+            track = self.track_uri
+            context = {"uri": self.context_uri} if self.context_uri else None
+        return {
+            "is_playing": True,
+            "progress_ms": 1000,
+            "context": context,
+            "device": {"id": "dev"},
+            "item": {
+                "uri": track,
+                "name": track,
+                "duration_ms": 200000,
+                "album": {"uri": "spotify:album:" + track[-1]},
+                "artists": [{"name": "A", "uri": "spotify:artist:ar" + track[-1]}],
+            },
+        }
+
+    def start_playback(self, device_id=None, context_uri=None, uris=None, offset=None, position_ms=None):
+        if self.before_start:
+            self.before_start(context_uri, uris)
+        roll = self._call()
+        if roll < self.offline_rate:
+            raise ConnectionError("injected offline")
+        if roll > 1 - self.failure_rate:
+            raise RuntimeError("injected failure")
+        with self._lock:
+            self.started.append(context_uri or tuple(uris or ()))
+            if context_uri or uris:
+                self.context_uri = context_uri
+                self.track_uri = (offset or {}).get("uri") or (uris[0] if uris else f"spotify:track:{context_uri[-1]}0")
+
+    def queue(self):
+        self._call()
+        with self._lock:
+            return {"currently_playing": {"uri": self.track_uri}, "queue": []}
+
+    def devices(self):
+        self._call()
+        return {"devices": [{"id": "dev", "is_active": True}]}
+
+    def playlist(self, playlist_id):
+        self._call()
+        return {"name": f"Playlist {playlist_id}"}
+
+    def album(self, album_id):
+        self._call()
+        return {"name": f"Album {album_id}"}
+
+    def artist(self, artist_id):
+        self._call()
+        return {"name": f"Artist {artist_id}"}
+
+    def album_tracks(self, album_id, limit=50, offset=0):
+        self._call()
+        return {"items": [{"uri": f"spotify:track:{album_id}{idx}"} for idx in range(5)], "next": None}
+
+    def artist_top_tracks(self, artist_id):
+        self._call()
+        return {"tracks": [{"uri": f"spotify:track:top{idx}"} for idx in range(10)]}
+
+    def artist_albums(self, artist_id, album_type=None, limit=50):
+        self._call()
+        return {"items": [{"uri": f"spotify:album:{idx}", "name": f"Album {idx}", "release_date": "2020"} for idx in range(3)]}
+
+    def current_user_top_tracks(self, limit=50, offset=0, time_range="medium_term"):
+        self._call()
+        if offset:
+            return {"items": []}
+        return {"items": [{"uri": f"spotify:track:{time_range[0]}{idx}"} for idx in range(limit)]}
+
+    def playlist_items(self, playlist_id, fields=None, limit=100):
+        self._call()
+        return {"items": [{"track": {"uri": f"spotify:track:pl{idx}"}} for idx in range(5)]}
+
+    def seek_track(self, position_ms, device_id=None):
+        self._call()
+
+    def next_track(self, device_id=None):
+        self._call()
+
+
+class RecordingHistory:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pushed = []
+        self.popped = []
+
+    def record(self, event, frame):
+        with self._lock:
+            if event == "pushed":
+                self.pushed.append(frame)
+            elif event == "popped":
+                self.popped.append(frame)
+
+
+class ControllerConcurrencyTests(unittest.TestCase):
+    def hammer(self, controller, seed, ops=120):
+        rng = random.Random(seed)
+        actions = [
+            controller.hop_in_album,
+            lambda: controller.hop_in_album(from_start=True),
+            controller.hop_in_artist,
+            lambda: controller.hop_in_artist(radio=True),
+            lambda: controller.queue_new_from_top_tracks(size=10),
+            controller.hop_out,
+            controller.hop_out,
+            controller.hop_out,
+            controller.current_playback,
+            controller.stack_summary,
+            controller.export_stack,
+        ]
+        for _ in range(ops):
+            action = controller.hop_out_to_root if rng.random() < 0.02 else rng.choice(actions)
+            try:
+                action()
+            except RuntimeError:
+                pass
+
+    def assert_stack_matches_history(self, controller, history):
+        stack_ids = [id(frame) for frame in controller.stack]
+        popped_ids = [id(frame) for frame in history.popped]
+        pushed_ids = {id(frame) for frame in history.pushed}
+
+        self.assertEqual(len(stack_ids), len(set(stack_ids)))
+        self.assertEqual(len(popped_ids), len(set(popped_ids)), "a frame was popped twice")
+        self.assertTrue(set(popped_ids) <= pushed_ids, "popped a frame that was never pushed")
+        self.assertEqual(set(stack_ids), pushed_ids - set(popped_ids))
+
+    def run_threads(self, controller, threads=8):
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(self.hammer, controller, seed) for seed in range(threads)]:
+                future.result()
+
+    def test_parallel_hops_keep_stack_consistent(self):
+        sp = FakeSpotify(seed=1)
+        history = RecordingHistory()
+        controller = SpotifyStackController(sp, history=history)
+
+        self.run_threads(controller)
+
+        self.assert_stack_matches_history(controller, history)
+
+    def test_failed_playback_rolls_back_under_contention(self):
+        sp = FakeSpotify(seed=2, failure_rate=0.15)
+        history = RecordingHistory()
+        controller = SpotifyStackController(sp, history=history)
+
+        self.run_threads(controller)
+
+        self.assert_stack_matches_history(controller, history)
+
+    def test_offline_journal_drains_after_contention(self):
+        sp = FakeSpotify(seed=3, offline_rate=0.2)
+        history = RecordingHistory()
+        controller = SpotifyStackController(sp, history=history)
+
+        self.run_threads(controller)
+        sp.offline_rate = 0.0
+        controller.current_playback()
+
+        self.assertEqual(len(controller.journal), 0)
+        self.assertFalse(controller._replaying)
+        self.assert_stack_matches_history(controller, history)
+
+    def test_failed_queue_top_removes_only_its_own_frame(self):
+        sp = FakeSpotify(seed=4, max_latency_s=0)
+        controller = SpotifyStackController(sp)
+        hopped_in = threading.Event()
+        queue_started = threading.Event()
+
+        def before_start(context_uri, uris):
+            if uris:
+                queue_started.set()
+                hopped_in.wait(timeout=5)
+                raise RuntimeError("queue rejected")
+
+        sp.before_start = before_start
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            queue_top = executor.submit(controller.queue_new_from_top_tracks, 10)
+            self.assertTrue(queue_started.wait(timeout=5))
+            self.assertEqual(len(controller.stack), 1)
+
+            controller.hop_in_album()
+            album_frame = controller.stack[-1]
+            hopped_in.set()
+            with self.assertRaises(RuntimeError):
+                queue_top.result(timeout=5)
+
+        self.assertEqual(len(controller.stack), 1)
+        self.assertIs(controller.stack[0], album_frame)
+
+    def test_concurrent_hop_outs_restore_distinct_frames(self):
+        sp = FakeSpotify(seed=5)
+        controller = SpotifyStackController(sp)
+        for idx in range(6):
+            sp.context_uri = f"spotify:playlist:p{idx}"
+            controller.hop_in_album()
+        sp.started.clear()
+        barrier = threading.Barrier(6)
+
+        def hop_out():
+            barrier.wait(timeout=5)
+            return controller.hop_out()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = [future.result() for future in [executor.submit(hop_out) for _ in range(6)]]
+
+        self.assertEqual(results, ["Hop out: resumed context"] * 6)
+        self.assertEqual(controller.stack, [])
+        self.assertEqual(sorted(sp.started), [f"spotify:playlist:p{idx}" for idx in range(6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,6 +28,7 @@ class SpotifyStackControllerTests(unittest.TestCase):
             "currently_playing": {"uri": "spotify:track:t1"},
             "queue": [{"uri": "spotify:track:t2"}],
         }
+        sp.playlist_items.return_value = {"items": [{"track": {"uri": "spotify:track:p1"}}]}
         return sp
 
     def test_hop_in_pushes_frame_and_switches_to_album(self):
@@ -106,6 +107,74 @@ class SpotifyStackControllerTests(unittest.TestCase):
             position_ms=42000,
         )
 
+    def test_hop_out_to_root_restores_bottom_frame_and_clears_stack(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+        controller.hop_in_album()
+        sp.current_playback.return_value["context"] = {"uri": "spotify:album:a1"}
+        sp.current_playback.return_value["item"]["uri"] = "spotify:track:t9"
+        controller.hop_in_album()
+        sp.start_playback.reset_mock()
+
+        result = controller.hop_out_to_root()
+
+        self.assertEqual(result, "Hop out to root: resumed context")
+        self.assertEqual(controller.stack, [])
+        sp.start_playback.assert_called_once_with(
+            device_id="dev123",
+            context_uri="spotify:playlist:abc",
+            uris=None,
+            offset={"uri": "spotify:track:t1"},
+            position_ms=42000,
+        )
+
+    def test_hop_in_artist_plays_top_tracks_after_current_track(self):
+        sp = self.make_sp()
+        sp.current_playback.return_value["item"]["artists"] = [{"name": "A", "uri": "spotify:artist:ar1"}]
+        sp.artist_top_tracks.return_value = {
+            "tracks": [{"uri": "spotify:track:top1"}, {"uri": "spotify:track:t1"}, {"uri": "spotify:track:top2"}]
+        }
+        sp.artist_albums.return_value = {"items": []}
+        controller = SpotifyStackController(sp)
+
+        result = controller.hop_in_artist()
+
+        self.assertEqual(result, "Hop in Artist: A")
+        self.assertEqual(controller.stack[-1].context_uri, "spotify:playlist:abc")
+        sp.start_playback.assert_called_once_with(
+            device_id="dev123",
+            context_uri=None,
+            uris=["spotify:track:t1", "spotify:track:top1", "spotify:track:top2"],
+            offset={"uri": "spotify:track:t1"},
+            position_ms=42000,
+        )
+        sp.artist_top_tracks.assert_called_once_with("ar1")
+
+        # Hopping deeper labels the artist frame by artist, not as Top Queue.
+        sp.current_playback.return_value["context"] = None
+        controller.hop_in_album()
+        self.assertEqual(controller.stack[-1].source_label, "Artist: A")
+
+    def test_hop_in_artist_uses_prefetched_catalog(self):
+        sp = self.make_sp()
+        sp.current_playback.return_value["item"]["artists"] = [{"name": "A", "uri": "spotify:artist:ar1"}]
+        sp.artist_top_tracks.return_value = {"tracks": [{"uri": "spotify:track:top1"}]}
+        sp.artist_albums.return_value = {
+            "items": [{"uri": "spotify:album:a1", "name": "Album A", "release_date": "2020-01-01"}]
+        }
+        sp.album_tracks.return_value = {"items": [{"uri": "spotify:track:t1"}, {"uri": "spotify:track:a2"}]}
+        executor = Mock()
+        executor.submit.side_effect = lambda fn, *args: fn(*args)
+        controller = SpotifyStackController(sp, executor=executor)
+
+        controller.observe_playback(sp.current_playback.return_value)
+        sp.artist_top_tracks.reset_mock()
+        result = controller.hop_in_artist(radio=True)
+
+        self.assertEqual(result, "Hop in Artist radio: A")
+        sp.artist_top_tracks.assert_not_called()
+        self.assertEqual(sp.start_playback.call_args.kwargs["uris"], ["spotify:track:t1", "spotify:track:a2"])
+
     def test_seek_relative_clamps_to_song_duration(self):
         sp = self.make_sp()
         controller = SpotifyStackController(sp)
@@ -129,6 +198,20 @@ class SpotifyStackControllerTests(unittest.TestCase):
         self.assertEqual(frame.source_label, "My Playlist")
         sp.start_playback.assert_called_once()
 
+    def test_queue_top_excludes_tracks_the_stack_resumes_into(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+        controller.get_all_top_tracks = Mock(
+            return_value=["spotify:track:t1", "spotify:track:t2", "spotify:track:x1", "spotify:track:x2"]
+        )
+
+        controller.queue_new_from_top_tracks(size=3)
+
+        self.assertEqual(len(controller.active_uris), 3)
+        self.assertNotIn("spotify:track:t1", controller.active_uris)
+        self.assertNotIn("spotify:track:t2", controller.active_uris)
+        self.assertIn("spotify:track:p1", controller.active_uris)
+
     def test_hop_out_returns_to_album_after_queue_top(self):
         sp = self.make_sp()
         playback = sp.current_playback.return_value
@@ -0,0 +1,149 @@
+import time
+import unittest
+from unittest.mock import Mock
+
+from spotify_stack.controller import PlaybackFrame, SpotifyStackController
+from spotify_stack.history import SessionHistory
+
+
+def make_frame(track_name, artist_names="A", source_label="My Playlist", track_uri=None, context_uri="spotify:playlist:abc"):
+    return PlaybackFrame(
+        context_uri=context_uri,
+        track_uri=track_uri or f"spotify:track:{track_name.lower().replace(' ', '_')}",
+        progress_ms=42000,
+        resume_uris=None,
+        track_name=track_name,
+        artist_names=artist_names,
+        source_label=source_label,
+    )
+
+
+class SessionHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.history = SessionHistory()
+        self.addCleanup(self.history.close)
+
+    def test_prefix_search_matches_track_artist_and_source(self):
+        self.history.record("pushed", make_frame("Harvest Moon", artist_names="Neil Young"))
+        self.history.record("pushed", make_frame("Heart of Gold", artist_names="Neil Young", source_label="Album: Harvest"))
+        self.history.record("pushed", make_frame("Teardrop", artist_names="Massive Attack"))
+
+        self.assertEqual([e.frame.track_name for e in self.history.search("harv")], ["Heart of Gold", "Harvest Moon"])
+        self.assertEqual([e.frame.track_name for e in self.history.search("massive tear")], ["Teardrop"])
+        self.assertEqual(self.history.search("zzz"), [])
+
+    def test_repeated_observations_collapse_into_one_entry(self):
+        frame = make_frame("Teardrop")
+        first = self.history.record("observed", frame)
+        frame.progress_ms = 90000
+        second = self.history.record("observed", frame)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.history.get(first).frame.progress_ms, 90000)
+
+    def test_search_returns_latest_entry_per_frame(self):
+        frame = make_frame("Teardrop")
+        self.history.record("pushed", frame)
+        latest = self.history.record("popped", frame)
+
+        results = self.history.search("teardrop")
+
+        self.assertEqual([entry.id for entry in results], [latest])
+
+    def test_search_with_common_terms_stays_fast(self):
+        with self.history._conn:
+            self.history._conn.execute("BEGIN")
+            self.history._conn.executemany(
+                "INSERT INTO frames (event, recorded_at, context_uri, track_uri, progress_ms, resume_uris,"
+                " track_name, artist_names, source_label) VALUES ('pushed', 0, ?, ?, 0, NULL, ?, ?, ?)",
+                (
+                    (f"spotify:playlist:{i % 500}", f"spotify:track:{i}", f"Love Night {i % 97}", f"Artist {i % 2000}", f"Playlist {i % 500}")
+                    for i in range(20_000)
+                ),
+            )
+
+        for query in ("love", "artist 12", "love night", "playlist 49"):
+            timings = []
+            for _ in range(5):
+                started = time.perf_counter()
+                results = self.history.search(query)
+                timings.append(time.perf_counter() - started)
+            self.assertEqual(len(results), 20)
+            # About 1 ms here (100k rows: under 2 ms); a loose bound against outliers.
+            self.assertLess(sorted(timings)[2], 0.01, query)
+
+        # Prefixes past the indexed lengths make FTS5 merge whole doclists,
+        # which grows with history size rather than with the result count.
+        sql = self.history._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'frames_fts'").fetchone()[0]
+        self.assertIn("prefix='1 2 3 4 5 6'", sql)
+
+    def test_long_terms_match_whole_prefix(self):
+        self.history.record("pushed", make_frame("Harvester"))
+        self.history.record("pushed", make_frame("Harvesting Time"))
+
+        self.assertEqual([e.frame.track_name for e in self.history.search("harvester")], ["Harvester"])
+        self.assertEqual([e.frame.track_name for e in self.history.search("harvest")], ["Harvesting Time", "Harvester"])
+
+    def test_long_terms_are_checked_before_the_result_limit(self):
+        self.history.record("pushed", make_frame("Summertime"))
+        for idx in range(40):
+            self.history.record("pushed", make_frame(f"Summer {idx}"))
+
+        self.assertEqual([e.frame.track_name for e in self.history.search("summertime", limit=8)], ["Summertime"])
+
+    def test_controller_records_push_and_pop_and_restores_entries(self):
+        sp = Mock()
+        sp.current_playback.return_value = {
+            "progress_ms": 42000,
+            "context": {"uri": "spotify:playlist:abc"},
+            "device": {"id": "dev123"},
+            "item": {
+                "uri": "spotify:track:t1",
+                "album": {"uri": "spotify:album:a1"},
+                "artists": [{"name": "A"}],
+                "name": "Track 1",
+            },
+        }
+        sp.playlist.return_value = {"name": "My Playlist"}
+        sp.queue.return_value = {"currently_playing": {"uri": "spotify:track:t1"}, "queue": []}
+        controller = SpotifyStackController(sp, history=self.history)
+        controller.hop_in_album()
+        controller.hop_out()
+        self.assertEqual([e.event for e in self.history.recent()], ["popped"])
+
+        entry = controller.search_history("my play")[0]
+        sp.start_playback.reset_mock()
+        result = controller.restore_history_entry(entry.id)
+
+        self.assertEqual(result, "Hop back: Track 1 - A (resumed context)")
+        self.assertEqual(len(controller.stack), 1)
+        sp.start_playback.assert_called_once_with(
+            device_id="dev123",
+            context_uri="spotify:playlist:abc",
+            uris=None,
+            offset={"uri": "spotify:track:t1"},
+            position_ms=42000,
+        )
+
+    def test_observed_frame_without_context_restores_its_track(self):
+        sp = Mock()
+        sp.current_playback.return_value = None
+        sp.devices.return_value = {"devices": [{"id": "dev123", "is_active": True}]}
+        self.history.record("observed", make_frame("Teardrop", source_label="Top Queue", context_uri=None))
+        controller = SpotifyStackController(sp, history=self.history)
+
+        entry = controller.search_history("tear")[0]
+        result = controller.restore_history_entry(entry.id)
+
+        self.assertEqual(result, "Hop back: Teardrop - A (resumed queue snapshot)")
+        sp.start_playback.assert_called_once_with(
+            device_id="dev123",
+            context_uri=None,
+            uris=["spotify:track:teardrop"],
+            offset={"uri": "spotify:track:teardrop"},
+            position_ms=42000,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
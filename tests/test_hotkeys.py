@@ -0,0 +1,116 @@
+import unittest
+from collections import defaultdict
+from unittest.mock import Mock
+
+from spotify_stack.hotkeys import KEYMAP, HotkeyDispatcher, Keymap
+
+
+class HotkeyDispatcherTests(unittest.TestCase):
+    def make_dispatcher(self, raw_keymap=None):
+        self.handlers = defaultdict(Mock)
+        return HotkeyDispatcher(Keymap.from_dict(raw_keymap or KEYMAP), self.handlers.__getitem__)
+
+    def tap(self, dispatcher, name, at, hold=0.05):
+        dispatcher.feed(name, "down", at)
+        dispatcher.feed(name, "up", at + hold)
+        dispatcher.process(now=at + hold)
+
+    def test_press_fires_action(self):
+        dispatcher = self.make_dispatcher()
+
+        self.tap(dispatcher, "f15", at=0.0)
+
+        self.handlers["next_track"].assert_called_once_with()
+
+    def test_bounce_within_debounce_window_is_dropped(self):
+        dispatcher = self.make_dispatcher()
+
+        self.tap(dispatcher, "f15", at=0.0, hold=0.01)
+        self.tap(dispatcher, "f15", at=0.05, hold=0.01)
+        self.tap(dispatcher, "f15", at=1.0, hold=0.01)
+
+        self.assertEqual(self.handlers["next_track"].call_count, 2)
+
+    def test_held_key_without_repeat_policy_fires_once(self):
+        dispatcher = self.make_dispatcher()
+
+        for idx in range(30):
+            dispatcher.feed("f14", "down", idx * 0.03)
+        dispatcher.feed("f14", "up", 1.0)
+        dispatcher.process(now=1.0)
+
+        self.handlers["hop_in_album"].assert_called_once_with()
+
+    def test_held_seek_key_is_coalesced_and_accelerates(self):
+        dispatcher = self.make_dispatcher()
+
+        dispatcher.feed("f18", "down", 0.0)
+        dispatcher.process(now=0.0)
+        at = 0.0
+        while at < 2.5:
+            at += 0.03
+            dispatcher.feed("f18", "down", at)
+            dispatcher.process(now=at)
+        dispatcher.feed("f18", "up", at)
+        dispatcher.process(now=at)
+
+        calls = self.handlers["seek_forward"].call_args_list
+        self.assertLessEqual(len(calls), 12)
+        self.assertEqual(calls[0].args, (1,))
+        self.assertEqual(calls[-1].args, (3,))
+
+    def test_long_press_fires_long_action_instead_of_press(self):
+        dispatcher = self.make_dispatcher()
+
+        dispatcher.feed("f19", "down", 0.0)
+        dispatcher.process(now=0.3)
+        dispatcher.process(now=0.7)
+        dispatcher.feed("f19", "up", 0.8)
+        dispatcher.process(now=0.8)
+
+        self.handlers["hop_out_to_root"].assert_called_once_with()
+        self.handlers["hop_out"].assert_not_called()
+
+    def test_short_press_on_long_press_key_fires_on_release(self):
+        dispatcher = self.make_dispatcher()
+
+        self.tap(dispatcher, "f19", at=0.0, hold=0.2)
+
+        self.handlers["hop_out"].assert_called_once_with()
+        self.handlers["hop_out_to_root"].assert_not_called()
+
+    def test_chord_fires_chord_action_only(self):
+        dispatcher = self.make_dispatcher({"f13": "previous_track", "f15": "next_track", "f13+f15": "hop_out"})
+
+        dispatcher.feed("f13", "down", 0.0)
+        dispatcher.feed("f15", "down", 0.05)
+        dispatcher.feed("f13", "up", 0.2)
+        dispatcher.feed("f15", "up", 0.2)
+        dispatcher.process(now=0.2)
+
+        self.handlers["hop_out"].assert_called_once_with()
+        self.handlers["previous_track"].assert_not_called()
+        self.handlers["next_track"].assert_not_called()
+
+    def test_unmapped_keys_are_ignored(self):
+        dispatcher = self.make_dispatcher({"f13": "previous_track", "f15": "next_track", "f13+f15": "hop_out"})
+
+        dispatcher.feed("shift", "down", 0.0)
+        dispatcher.process(now=0.0)
+        self.assertIsNone(dispatcher._next_deadline())
+
+        dispatcher.feed("f13", "down", 0.1)
+        dispatcher.feed("f15", "down", 0.15)
+        dispatcher.feed("f13", "up", 0.3)
+        dispatcher.feed("f15", "up", 0.3)
+        dispatcher.process(now=0.3)
+
+        self.handlers["hop_out"].assert_called_once_with()
+
+    def test_unknown_repeat_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Keymap.from_dict({"f16": {"press": "seek_back", "repeat": "turbo"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
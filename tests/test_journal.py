@@ -0,0 +1,147 @@
+import unittest
+from unittest.mock import Mock
+
+from spotify_stack.controller import SpotifyStackController
+from spotify_stack.journal import CommandJournal
+
+
+class CommandJournalTests(unittest.TestCase):
+    def test_hop_in_then_hop_out_cancels(self):
+        journal = CommandJournal()
+        journal.record("hop_in_album", "push", {"context_uri": "spotify:album:a1"})
+        journal.record("hop_out", "pop", {"context_uri": "spotify:playlist:abc"})
+
+        self.assertIsNone(journal.net_effect())
+
+    def test_only_final_target_survives(self):
+        journal = CommandJournal()
+        journal.record("hop_in_album", "push", {"context_uri": "spotify:album:a1"})
+        journal.record("hop_in_album", "push", {"context_uri": "spotify:album:a2"})
+        journal.record("hop_out", "pop", {"context_uri": "spotify:album:a1"})
+
+        self.assertEqual([entry.action for entry in journal.compress()], ["hop_in_album"])
+        self.assertEqual(journal.net_effect().playback, {"context_uri": "spotify:album:a1"})
+
+    def test_hop_out_before_hop_in_does_not_cancel(self):
+        journal = CommandJournal()
+        journal.record("hop_out", "pop", {"context_uri": "spotify:playlist:parent"})
+        journal.record("hop_in_album", "push", {"context_uri": "spotify:album:a1"})
+
+        self.assertEqual(len(journal.compress()), 2)
+        self.assertEqual(journal.net_effect().playback, {"context_uri": "spotify:album:a1"})
+
+
+class OfflineControllerTests(unittest.TestCase):
+    def make_sp(self):
+        sp = Mock()
+        sp.current_playback.return_value = {
+            "is_playing": True,
+            "progress_ms": 42000,
+            "context": {"uri": "spotify:playlist:abc"},
+            "device": {"id": "dev123"},
+            "item": {
+                "uri": "spotify:track:t1",
+                "album": {"uri": "spotify:album:a1"},
+                "artists": [{"name": "A"}],
+                "name": "Track 1",
+            },
+        }
+        sp.playlist.return_value = {"name": "My Playlist"}
+        sp.queue.return_value = {"currently_playing": {"uri": "spotify:track:t1"}, "queue": []}
+        return sp
+
+    def go_offline(self, sp):
+        online_playback = sp.current_playback.return_value
+        sp.current_playback.side_effect = ConnectionError("network down")
+        sp.start_playback.side_effect = ConnectionError("network down")
+        return online_playback
+
+    def go_online(self, sp, playback):
+        sp.current_playback.side_effect = None
+        sp.current_playback.return_value = playback
+        sp.start_playback.side_effect = None
+        sp.start_playback.reset_mock()
+
+    def test_offline_hop_in_updates_stack_and_replays_on_reconnect(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+        controller.current_playback()
+        playback = self.go_offline(sp)
+
+        result = controller.hop_in_album()
+
+        self.assertEqual(result, "Hop in: spotify:album:a1 (offline, will replay)")
+        self.assertEqual(len(controller.stack), 1)
+        self.assertEqual(len(controller.journal), 1)
+
+        self.go_online(sp, playback)
+        controller.current_playback()
+
+        self.assertEqual(len(controller.journal), 0)
+        sp.start_playback.assert_called_once_with(
+            device_id="dev123",
+            context_uri="spotify:album:a1",
+            uris=None,
+            offset={"uri": "spotify:track:t1"},
+            position_ms=42000,
+        )
+
+    def test_offline_hop_in_and_out_replays_nothing(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+        controller.current_playback()
+        playback = self.go_offline(sp)
+
+        controller.hop_in_album()
+        result = controller.hop_out()
+
+        # The pair cancels out, so there is nothing left to wait for.
+        self.assertEqual(result, "Hop out: resumed context")
+        self.assertEqual(controller.stack, [])
+        self.assertEqual(len(controller.journal), 0)
+
+        self.go_online(sp, playback)
+        controller.current_playback()
+
+        self.assertEqual(len(controller.journal), 0)
+        sp.start_playback.assert_not_called()
+
+    def test_chained_offline_hops_build_frames_from_the_expected_playback(self):
+        sp = self.make_sp()
+        sp.album.return_value = {"name": "Album 1"}
+        controller = SpotifyStackController(sp)
+        controller.current_playback()
+        self.go_offline(sp)
+
+        controller.hop_in_album()
+        controller.hop_in_album()
+
+        self.assertEqual(
+            [(frame.context_uri, frame.track_uri, frame.progress_ms) for frame in controller.stack],
+            [("spotify:playlist:abc", "spotify:track:t1", 42000), ("spotify:album:a1", "spotify:track:t1", 42000)],
+        )
+
+        controller.hop_out()
+        controller.hop_out()
+        controller.hop_in_album()
+
+        # Back on the playlist, so that is what the new frame records.
+        self.assertEqual(
+            [(frame.context_uri, frame.track_uri) for frame in controller.stack],
+            [("spotify:playlist:abc", "spotify:track:t1")],
+        )
+        self.assertEqual(controller.journal.net_effect().playback["context_uri"], "spotify:album:a1")
+
+    def test_offline_without_known_playback_raises(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+        self.go_offline(sp)
+
+        with self.assertRaises(ConnectionError):
+            controller.hop_in_album()
+
+        self.assertEqual(controller.stack, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
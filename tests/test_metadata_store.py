@@ -0,0 +1,132 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+
+from spotify_stack.controller import SpotifyStackController
+from spotify_stack.metadata_store import MetadataStore
+
+
+class MetadataStoreTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "metadata.sqlite")
+        self.now = 1000.0
+
+    def make_store(self, **kwargs):
+        store = MetadataStore(self.path, clock=lambda: self.now, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_values_are_visible_to_other_store_instances(self):
+        writer = self.make_store()
+        reader = self.make_store()
+
+        writer.set("album_tracks", "spotify:album:a1", ["spotify:track:t1", "spotify:track:t2"])
+
+        self.assertEqual(reader.get("album_tracks", "spotify:album:a1"), ["spotify:track:t1", "spotify:track:t2"])
+
+    def test_entries_expire_after_ttl(self):
+        store = self.make_store(ttl_s=60)
+        store.set("context_labels", "spotify:playlist:abc", "My Playlist")
+
+        self.now += 61
+
+        self.assertIsNone(store.get("context_labels", "spotify:playlist:abc"))
+        self.assertEqual(store.purge_expired(), 1)
+
+    def test_namespace_behaves_like_a_dict(self):
+        labels = self.make_store().namespace("context_labels")
+
+        labels["spotify:playlist:abc"] = "My Playlist"
+
+        self.assertIn("spotify:playlist:abc", labels)
+        self.assertEqual(labels["spotify:playlist:abc"], "My Playlist")
+        self.assertEqual(list(labels), ["spotify:playlist:abc"])
+        del labels["spotify:playlist:abc"]
+        self.assertNotIn("spotify:playlist:abc", labels)
+        with self.assertRaises(KeyError):
+            labels["spotify:playlist:abc"]
+
+    def test_concurrent_readers_and_writer(self):
+        store = self.make_store()
+        errors = []
+
+        def write():
+            for idx in range(200):
+                store.set("context_labels", f"k{idx}", f"v{idx}")
+
+        def read():
+            try:
+                for idx in range(200):
+                    value = store.get("context_labels", f"k{idx}")
+                    if value not in (None, f"v{idx}"):
+                        errors.append(value)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(store.keys("context_labels")), 200)
+
+    def test_controllers_reuse_labels_and_album_tracks_from_the_store(self):
+        first_sp = Mock()
+        first_sp.playlist.return_value = {"name": "My Playlist"}
+        first_sp.album_tracks.return_value = {"items": [{"uri": "spotify:track:t1"}], "next": None}
+        first = SpotifyStackController(
+            first_sp,
+            metadata_cache=self.make_store().namespace("context_labels"),
+            album_tracks_cache=self.make_store().namespace("album_tracks"),
+        )
+        first._source_label_from_context("spotify:playlist:abc")
+        first.album_track_uris("spotify:album:a1")
+
+        second_sp = Mock()
+        store = self.make_store()
+        second = SpotifyStackController(
+            second_sp,
+            metadata_cache=store.namespace("context_labels"),
+            album_tracks_cache=store.namespace("album_tracks"),
+        )
+
+        self.assertEqual(second._source_label_from_context("spotify:playlist:abc"), "My Playlist")
+        self.assertEqual(second.album_track_uris("spotify:album:a1"), ["spotify:track:t1"])
+        second_sp.playlist.assert_not_called()
+        second_sp.album_tracks.assert_not_called()
+
+    def test_label_lookup_survives_entry_expiring_mid_call(self):
+        # Another process can expire the row between a membership check and a read.
+        class ExpiringCache(dict):
+            def __contains__(self, key):
+                return True
+
+        sp = Mock()
+        sp.playlist.return_value = {"name": "My Playlist"}
+        controller = SpotifyStackController(sp, metadata_cache=ExpiringCache())
+
+        self.assertEqual(controller._source_label_from_context("spotify:playlist:abc"), "My Playlist")
+        sp.playlist.assert_called_once_with("abc")
+
+    def test_failed_label_lookup_is_not_cached(self):
+        failing_sp = Mock()
+        failing_sp.playlist.side_effect = ConnectionError("network down")
+        first = SpotifyStackController(failing_sp, metadata_cache=self.make_store().namespace("context_labels"))
+
+        self.assertEqual(first._source_label_from_context("spotify:playlist:abc"), "Playlist")
+
+        healthy_sp = Mock()
+        healthy_sp.playlist.return_value = {"name": "My Playlist"}
+        second = SpotifyStackController(healthy_sp, metadata_cache=self.make_store().namespace("context_labels"))
+
+        self.assertEqual(second._source_label_from_context("spotify:playlist:abc"), "My Playlist")
+
+
+if __name__ == "__main__":
+    unittest.main()
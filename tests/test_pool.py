@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import Mock
+
+from spotify_stack.pool import AccountConfig, ControllerPool
+
+
+class ControllerPoolTests(unittest.TestCase):
+    def make_pool(self):
+        clients = {}
+
+        def client_factory(config, session):
+            sp = Mock()
+            sp.playlist.return_value = {"name": f"Playlist via {config.name}"}
+            clients[config.name] = (sp, session)
+            return sp
+
+        pool = ControllerPool(client_factory=client_factory, max_workers=2)
+        self.addCleanup(pool.shutdown)
+        return pool, clients
+
+    def test_accounts_get_separate_clients_and_stacks(self):
+        pool, clients = self.make_pool()
+        home = pool.add_account(AccountConfig(name="home", token_cache_path="/tmp/home"))
+        demo = pool.add_account(AccountConfig(name="demo", token_cache_path="/tmp/demo"))
+
+        self.assertIsNot(home.controller, demo.controller)
+        self.assertIsNot(home.controller.stack, demo.controller.stack)
+        self.assertIs(home.sp, clients["home"][0])
+        self.assertIs(demo.sp, clients["demo"][0])
+        self.assertEqual(pool.names(), ["home", "demo"])
+
+    def test_accounts_share_http_session_and_metadata_cache(self):
+        pool, clients = self.make_pool()
+        home = pool.add_account(AccountConfig(name="home", token_cache_path="/tmp/home"))
+        demo = pool.add_account(AccountConfig(name="demo", token_cache_path="/tmp/demo"))
+
+        self.assertIs(clients["home"][1], clients["demo"][1])
+        label = home.controller._source_label_from_context("spotify:playlist:abc")
+        self.assertEqual(demo.controller._source_label_from_context("spotify:playlist:abc"), label)
+        demo.sp.playlist.assert_not_called()
+
+    def test_duplicate_account_is_rejected(self):
+        pool, _clients = self.make_pool()
+        pool.add_account(AccountConfig(name="home", token_cache_path="/tmp/home"))
+
+        with self.assertRaises(ValueError):
+            pool.add_account(AccountConfig(name="home", token_cache_path="/tmp/other"))
+
+    def test_device_name_routes_playback_to_registered_device(self):
+        pool, _clients = self.make_pool()
+        room = pool.add_account(AccountConfig(name="room", token_cache_path="/tmp/room", device_name="Listening Room"))
+        room.sp.devices.return_value = {
+            "devices": [
+                {"id": "laptop", "name": "Laptop", "is_active": True},
+                {"id": "speaker", "name": "Listening Room", "is_active": False},
+            ]
+        }
+
+        room.controller.next_track()
+        room.controller.next_track()
+
+        room.sp.next_track.assert_called_with(device_id="speaker")
+        room.sp.devices.assert_called_once()
+        room.sp.current_playback.assert_not_called()
+
+    def test_reconnected_device_is_looked_up_again(self):
+        pool, _clients = self.make_pool()
+        room = pool.add_account(AccountConfig(name="room", token_cache_path="/tmp/room", device_name="Listening Room"))
+        room.sp.devices.return_value = {"devices": [{"id": "speaker", "name": "Listening Room"}]}
+        room.controller.next_track()
+
+        # Spotify answers 404 "Device not found" once the old id is gone.
+        def next_track(device_id):
+            if device_id == "speaker":
+                gone = Exception("Device not found")
+                gone.http_status = 404
+                raise gone
+
+        room.sp.next_track.side_effect = next_track
+        room.sp.devices.return_value = {"devices": [{"id": "speaker-2", "name": "Listening Room"}]}
+        room.controller.next_track()
+        room.controller.next_track()
+
+        room.sp.next_track.assert_called_with(device_id="speaker-2")
+        self.assertEqual(room.sp.devices.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
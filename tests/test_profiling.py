@@ -0,0 +1,39 @@
+import unittest
+from unittest.mock import Mock
+
+from spotify_stack.controller import SpotifyStackController
+from spotify_stack.profiling import RunProfiler
+
+
+class RunProfilerTests(unittest.TestCase):
+    def test_counts_api_calls_through_instrumented_client(self):
+        profiler = RunProfiler()
+        sp = Mock()
+        sp.current_playback.return_value = None
+        sp.devices.return_value = {"devices": [{"id": "dev123", "is_active": True}]}
+        controller = SpotifyStackController(profiler.instrument_client(sp))
+
+        controller.toggle_playback()
+        controller.next_track()
+
+        self.assertEqual(profiler.counts["api:current_playback"], 2)
+        self.assertEqual(profiler.counts["api:next_track"], 1)
+        self.assertEqual(profiler.counts["api:devices"], 1)
+        self.assertEqual(profiler.counts["api_calls"], 4)
+
+    def test_report_lists_rates_per_minute(self):
+        now = [0.0]
+        profiler = RunProfiler(clock=lambda: now[0])
+        profiler.count("queue_wakeup", 30)
+        profiler.count("api_calls", 4)
+        now[0] = 120.0
+
+        report = profiler.report()
+
+        self.assertIn("Profile: 120.0s", report)
+        self.assertRegex(report, r"queue_wakeup\s+30\s+15\.0/min")
+        self.assertRegex(report, r"api_calls\s+4\s+2\.0/min")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import random
+import unittest
+from unittest.mock import Mock, patch
+
+from spotify_stack.queue_engine import QueueEngine
+
+
+class QueueEngineTests(unittest.TestCase):
+    def make_engine(self, **sources):
+        return QueueEngine(
+            sources={name: Mock(return_value=uris) for name, uris in sources.items()},
+            weights={name: 1.0 for name in sources},
+            rng=random.Random(7),
+        )
+
+    def test_pool_merges_sources_without_duplicates(self):
+        engine = self.make_engine(short_term=["a", "b"], long_term=["b", "c"])
+
+        self.assertEqual(sorted(engine.pool()), ["a", "b", "c"])
+
+    def test_pool_is_built_once(self):
+        engine = self.make_engine(short_term=["a", "b", "c"])
+
+        engine.sample(2)
+        engine.sample(2)
+
+        engine.sources["short_term"].assert_called_once()
+
+    def test_sample_respects_exclusions(self):
+        engine = self.make_engine(short_term=[f"t{i}" for i in range(20)])
+
+        selection = engine.sample(10, exclude={"t0", "t1", "t2"})
+
+        self.assertEqual(len(selection), 10)
+        self.assertEqual(len(set(selection)), 10)
+        self.assertFalse({"t0", "t1", "t2"} & set(selection))
+
+    def test_consecutive_samples_do_not_repeat(self):
+        engine = self.make_engine(short_term=[f"t{i}" for i in range(20)])
+
+        first = engine.sample(10)
+        second = engine.sample(10)
+
+        self.assertFalse(set(first) & set(second))
+
+    def test_excluded_tracks_fill_in_when_pool_is_short(self):
+        engine = self.make_engine(short_term=["a", "b", "c"])
+
+        selection = engine.sample(3, exclude={"a"})
+
+        self.assertEqual(sorted(selection), ["a", "b", "c"])
+
+    def test_failing_source_is_skipped(self):
+        engine = self.make_engine(short_term=["a", "b"])
+        engine.sources["long_term"] = Mock(side_effect=RuntimeError("boom"))
+
+        self.assertEqual(sorted(engine.sample(5)), ["a", "b"])
+
+    def make_queued_engine(self, uris):
+        queued = []
+        executor = Mock()
+        executor.submit.side_effect = lambda fn, *args: queued.append((fn, args))
+        engine = QueueEngine(sources={"short_term": Mock(return_value=uris)}, weights={"short_term": 1.0}, executor=executor)
+        return engine, queued
+
+    def test_warm_builds_pool_on_executor(self):
+        engine, queued = self.make_queued_engine(["a", "b"])
+
+        engine.warm()
+        self.assertIsNotNone(engine.warm())
+        self.assertEqual(len(queued), 1)
+        engine.sources["short_term"].assert_not_called()
+
+        fn, args = queued[0]
+        fn(*args)
+        self.assertEqual(sorted(engine.sample(2)), ["a", "b"])
+        engine.sources["short_term"].assert_called_once()
+        self.assertIsNone(engine.warm())
+
+    def test_press_builds_inline_when_warm_is_still_queued(self):
+        engine, queued = self.make_queued_engine(["a", "b"])
+        engine.warm()
+
+        self.assertEqual(sorted(engine.sample(2)), ["a", "b"])
+
+        fn, args = queued[0]
+        fn(*args)
+        engine.sources["short_term"].assert_called_once()
+
+    def test_expired_pool_is_served_while_rebuilding(self):
+        engine, queued = self.make_queued_engine(["a", "b"])
+        engine.warm()
+        fn, args = queued.pop()
+        fn(*args)
+        engine.sources["short_term"].return_value = ["c", "d"]
+
+        with patch("spotify_stack.queue_engine.time.monotonic", return_value=engine._built_at + engine.pool_ttl_s + 1):
+            self.assertEqual(sorted(engine.pool()), ["a", "b"])
+            self.assertEqual(len(queued), 1)
+            fn, args = queued.pop()
+            fn(*args)
+            self.assertEqual(sorted(engine.pool()), ["c", "d"])
+
+    def test_empty_build_is_not_retried_on_every_warm(self):
+        engine, queued = self.make_queued_engine([])
+        engine.warm()
+        fn, args = queued.pop()
+        fn(*args)
+
+        self.assertIsNone(engine.warm())
+        self.assertEqual(queued, [])
+
+    def test_heavier_sources_are_sampled_more_often(self):
+        engine = QueueEngine(
+            sources={"short_term": Mock(return_value=["heavy"]), "long_term": Mock(return_value=["light"])},
+            weights={"short_term": 9.0, "long_term": 1.0},
+            recent_frames=0,
+            rng=random.Random(3),
+        )
+
+        firsts = [engine.sample(1)[0] for _ in range(500)]
+
+        self.assertGreater(firsts.count("heavy"), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
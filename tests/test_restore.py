@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from spotify_stack.controller import SpotifyStackController
+from spotify_stack.restore import LatencyEstimator, extrapolate_progress
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance_by(self, seconds, result=None):
+        def side_effect(*_args, **_kwargs):
+            self.now += seconds
+            return result
+
+        return side_effect
+
+
+class RestoreHelpersTests(unittest.TestCase):
+    def test_latency_estimator_smooths_round_trips(self):
+        latency = LatencyEstimator(alpha=0.5)
+        self.assertEqual(latency.one_way_ms(), 0)
+
+        latency.observe(200)
+        latency.observe(400)
+
+        self.assertEqual(latency.one_way_ms(), 150)
+
+    def test_extrapolation_ignores_tiny_and_stale_gaps(self):
+        self.assertEqual(extrapolate_progress(42000, 100), 42000)
+        self.assertEqual(extrapolate_progress(42000, 600), 42600)
+        self.assertEqual(extrapolate_progress(42000, 60_000), 42000)
+        self.assertEqual(extrapolate_progress(179_900, 600, duration_ms=180_000), 180_000)
+
+
+class LatencyCompensationTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("spotify_stack.controller.time")
+        fake_time = patcher.start()
+        fake_time.monotonic.side_effect = self.clock
+        self.addCleanup(patcher.stop)
+
+    def make_sp(self):
+        sp = Mock()
+        self.playback = {
+            "is_playing": True,
+            "progress_ms": 42000,
+            "context": {"uri": "spotify:playlist:abc"},
+            "device": {"id": "dev123"},
+            "item": {
+                "uri": "spotify:track:t1",
+                "duration_ms": 180000,
+                "album": {"uri": "spotify:album:a1"},
+                "artists": [{"name": "A"}],
+                "name": "Track 1",
+            },
+        }
+        sp.current_playback.side_effect = self.clock.advance_by(0.4, self.playback)
+        sp.start_playback.side_effect = self.clock.advance_by(0.4)
+        sp.playlist.return_value = {"name": "My Playlist"}
+        sp.queue.return_value = {"currently_playing": {"uri": "spotify:track:t1"}, "queue": []}
+        return sp
+
+    def test_hop_in_compensates_for_lookup_and_network_time(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+
+        controller.hop_in_album()
+
+        # Sampled mid-flight at 0.2s; the command left at 0.4s plus ~200 ms one way.
+        self.assertEqual(sp.start_playback.call_args.kwargs["position_ms"], 42400)
+        # The old context kept playing until the new one landed (~0.6s).
+        self.assertEqual(controller.stack[-1].progress_ms, 42400)
+
+    def test_restore_drift_is_corrected_with_one_seek(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+        controller.hop_in_album()
+        self.playback["item"]["uri"] = "spotify:track:a9"
+        controller.current_playback()
+        sp.seek_track.assert_not_called()
+
+        controller.hop_out()
+        # Spotify reports the restored track, but stalled two seconds behind.
+        self.playback["item"]["uri"] = "spotify:track:t1"
+        self.playback["progress_ms"] = controller_target = sp.start_playback.call_args.kwargs["position_ms"]
+        self.clock.now += 2
+        controller.current_playback()
+        controller.current_playback()
+
+        # Landed at 1.801s; sampled mid-flight at 4.2s, so Spotify should have
+        # been at 44799 but reported 42400. The seek leaves at 4.4s and takes
+        # another ~200 ms one way: 44799 + 200 + 200.
+        sp.seek_track.assert_called_once()
+        self.assertEqual(controller_target, 42400)
+        self.assertEqual(sp.seek_track.call_args.kwargs["position_ms"], 45199)
+        self.assertEqual(sp.seek_track.call_args.kwargs["device_id"], "dev123")
+
+    def test_failed_drift_seek_does_not_fail_the_refresh(self):
+        sp = self.make_sp()
+        sp.seek_track.side_effect = ConnectionError("network down")
+        controller = SpotifyStackController(sp)
+        controller.hop_in_album()
+        self.playback["item"]["uri"] = "spotify:track:a9"
+        controller.hop_out()
+        self.playback["item"]["uri"] = "spotify:track:t1"
+        self.clock.now += 2
+
+        self.assertIs(controller.current_playback(), self.playback)
+        sp.seek_track.assert_called_once()
+
+    def test_restore_within_tolerance_is_left_alone(self):
+        sp = self.make_sp()
+        controller = SpotifyStackController(sp)
+        controller.hop_in_album()
+        self.playback["item"]["uri"] = "spotify:track:a9"
+        controller.hop_out()
+        target = sp.start_playback.call_args.kwargs["position_ms"]
+        self.playback["item"]["uri"] = "spotify:track:t1"
+        self.playback["progress_ms"] = target + 300
+
+        controller.current_playback()
+
+        sp.seek_track.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
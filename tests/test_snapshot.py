@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from spotify_stack.controller import PlaybackFrame, SpotifyStackController
+from spotify_stack.snapshot import StackLibrary, decode_stack, encode_stack, encode_stack_json
+
+
+def make_stack():
+    resume = [f"spotify:track:{'4uLU6hMCjMI75M1A2tKUQ' + str(idx % 10)}" for idx in range(100)]
+    return [
+        PlaybackFrame(
+            context_uri="spotify:playlist:37i9dQZF1DXcBWIGoYBM5M",
+            track_uri="spotify:track:0VjIjW4GlUZAMYd2vXMi3b",
+            progress_ms=42000,
+            resume_uris=None,
+            track_name="Blinding Lights",
+            artist_names="The Weeknd",
+            source_label="Today's Top Hits",
+        ),
+        PlaybackFrame(
+            context_uri=None,
+            track_uri=resume[3],
+            progress_ms=0,
+            resume_uris=resume + ["spotify:episode:512ojhOuo1ktJprKbVcKyQ", "spotify:local:odd:uri"],
+            track_name="Ünïcode ✓",
+            artist_names="A, B",
+            source_label="Top Queue",
+        ),
+    ]
+
+
+class SnapshotTests(unittest.TestCase):
+    def test_binary_round_trip(self):
+        frames = make_stack()
+
+        self.assertEqual(decode_stack(encode_stack(frames)), frames)
+
+    def test_json_round_trip(self):
+        frames = make_stack()
+
+        self.assertEqual(decode_stack(encode_stack_json(frames)), frames)
+
+    def test_binary_is_much_smaller_than_json(self):
+        frames = make_stack()
+
+        self.assertLess(len(encode_stack(frames)) * 2, len(encode_stack_json(frames)))
+
+    def test_rejects_unknown_data(self):
+        with self.assertRaises(ValueError):
+            decode_stack(b"not a stack")
+        with self.assertRaises(ValueError):
+            decode_stack(b"SSTK\x63")
+        with self.assertRaises(ValueError):
+            decode_stack(encode_stack(make_stack())[:40])
+        for bad_json in (b"{not json", b"{}", b'{"version": 1, "frames": [{"track_uri": 5}]}', b'{"version": 1, "frames": [1]}'):
+            with self.assertRaises(ValueError, msg=bad_json):
+                decode_stack(bad_json)
+
+    def test_controller_reports_unloadable_stacks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            library = StackLibrary(tmpdir)
+            controller = SpotifyStackController(Mock(), stack_library=library)
+            controller.stack = make_stack()
+            controller.save_named_stack("cli-home")
+            with open(os.path.join(tmpdir, "cli-home.stack"), "r+b") as handle:
+                handle.truncate(30)
+
+            self.assertTrue(controller.load_named_stack("cli-home").startswith("Could not load stack cli-home:"))
+            self.assertTrue(controller.load_named_stack("../escape").startswith("Could not load stack"))
+            self.assertEqual(controller.stack, make_stack())
+
+    def test_library_saves_and_loads_named_stacks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            library = StackLibrary(os.path.join(tmpdir, "stacks"))
+            library.save("evening", make_stack())
+            library.save("debug", make_stack(), fmt="json")
+
+            self.assertEqual(library.names(), ["debug", "evening"])
+            self.assertEqual(library.load("evening"), make_stack())
+            self.assertEqual(library.load("debug"), make_stack())
+            with self.assertRaises(KeyError):
+                library.load("missing")
+            with self.assertRaises(ValueError):
+                library.save("../escape", make_stack())
+
+    def test_saving_in_another_format_replaces_the_older_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            library = StackLibrary(tmpdir)
+            library.save("evening", make_stack())
+            library.save("evening", make_stack()[:1], fmt="json")
+
+            self.assertEqual(library.load("evening"), make_stack()[:1])
+            self.assertEqual(os.listdir(tmpdir), ["evening.json"])
+
+            library.save("evening", make_stack())
+            self.assertEqual(library.load("evening"), make_stack())
+            self.assertEqual(os.listdir(tmpdir), ["evening.stack"])
+
+    def test_controller_export_and_import(self):
+        controller = SpotifyStackController(Mock())
+        controller.stack = make_stack()
+        data = controller.export_stack()
+
+        other = SpotifyStackController(Mock())
+        result = other.import_stack(data)
+
+        self.assertEqual(result, "Loaded stack: 2 frames")
+        self.assertEqual(other.stack, make_stack())
+
+
+if __name__ == "__main__":
+    unittest.main()
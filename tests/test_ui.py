@@ -0,0 +1,120 @@
+import itertools
+import unittest
+from unittest.mock import Mock, patch
+
+from spotify_stack.ui import PUMP_INTERVAL_MS, REFRESH_PLAYING_MS, SpotifyStackApp
+
+
+class FakeVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+# Stands in for tk.Tk: records after() callbacks so a test can run them by hand.
+class FakeRoot:
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.pending = {}
+        self.after_calls = 0
+        self.cancel_calls = 0
+
+    def after(self, delay_ms, callback):
+        self.after_calls += 1
+        after_id = f"after#{next(self._ids)}"
+        self.pending[after_id] = (delay_ms, callback)
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.cancel_calls += 1
+        self.pending.pop(after_id, None)
+
+    def run(self, delay_ms):
+        for after_id, (delay, callback) in list(self.pending.items()):
+            if delay == delay_ms and after_id in self.pending:
+                del self.pending[after_id]
+                callback()
+
+    def delays(self):
+        return sorted(delay for delay, _callback in self.pending.values())
+
+    def title(self, *_args, **_kwargs):
+        pass
+
+    geometry = minsize = configure = title
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class SpotifyStackAppTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("spotify_stack.ui.tk.StringVar", FakeVar)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def build_ui(app):
+            app.stack_list = Mock()
+
+        patcher = patch.object(SpotifyStackApp, "_build_ui", build_ui)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_app(self):
+        controller = Mock()
+        controller.history = None
+        controller.stack = []
+        controller.current_playback.return_value = {
+            "is_playing": True,
+            "progress_ms": 1000,
+            "item": {"name": "Track 1", "artists": [{"name": "A"}]},
+        }
+        controller.stack_summary.return_value = ["(empty)"]
+        controller.describe_playback_source.return_value = "My Playlist"
+        self.root = FakeRoot()
+        return SpotifyStackApp(self.root, controller, executor=InlineExecutor())
+
+    def test_idle_app_schedules_only_the_timed_refresh(self):
+        app = self.make_app()
+        self.assertEqual(self.root.delays(), [PUMP_INTERVAL_MS])
+
+        self.root.run(PUMP_INTERVAL_MS)
+
+        self.assertEqual(self.root.delays(), [REFRESH_PLAYING_MS])
+        self.assertEqual(app.track_var.get(), "Track 1 - A")
+
+        # Each timed refresh costs one pump and re-arms one timer, nothing more.
+        after_calls = self.root.after_calls
+        for _ in range(3):
+            self.root.run(REFRESH_PLAYING_MS)
+            self.root.run(PUMP_INTERVAL_MS)
+        self.assertEqual(self.root.after_calls - after_calls, 6)
+        self.assertEqual(self.root.delays(), [REFRESH_PLAYING_MS])
+
+    def test_repeated_actions_leave_one_timed_refresh_armed(self):
+        app = self.make_app()
+        self.root.run(PUMP_INTERVAL_MS)
+
+        for _ in range(5):
+            app._run_action(lambda: "Skipped")
+            self.root.run(PUMP_INTERVAL_MS)
+            self.root.run(PUMP_INTERVAL_MS)
+
+        self.assertEqual(self.root.delays(), [REFRESH_PLAYING_MS])
+        self.assertEqual(self.root.cancel_calls, 5)
+        self.assertEqual(app.status_var.get(), "Skipped")
+
+        self.root.run(REFRESH_PLAYING_MS)
+        self.root.run(PUMP_INTERVAL_MS)
+        self.assertEqual(self.root.delays(), [REFRESH_PLAYING_MS])
+
+
+if __name__ == "__main__":
+    unittest.main()